@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        import accounts.stats
+
+        from django.conf import settings
+        if settings.SIGNAL_PROFILING:
+            from skillbridge.signal_profiler import profiler
+            profiler.install()
@@ -0,0 +1,72 @@
+"""
+Avatar thumbnails.
+
+Lists show dozens of avatars at 32-56px, so instead of the uploaded image
+they get square thumbnails made once per upload, off the request path, by
+the ``generate_avatar_thumbnails`` task. Every size is stored as WebP and
+as JPEG (for browsers without WebP) beside the original, e.g.
+``avatars/3f/3fa2...c9_small.webp``. Originals are content-addressed, so
+a re-uploaded image reuses its thumbnails.
+
+The ``avatar_image`` template tag (accounts/templatetags/avatars.py)
+serves the thumbnails once ``User.avatar_thumbnails_ready`` is set, and
+the original until then.
+"""
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from skillbridge.uploads import beside
+
+# Rendered size in CSS pixels is at most half of these, for 2x screens
+SIZES = {
+    'small': 128,   # lists, chat and the navbar
+    'medium': 320,  # profile pages
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def thumbnail_suffix(size, extension):
+    return f'{size}.{extension}'
+
+
+def flatten(image):
+    """RGB copy of ``image``, transparent areas on white (JPEG has no alpha)."""
+    if image.mode != 'RGBA':
+        return image.convert('RGB')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def make_thumbnails(storage, name):
+    """Store every size and format of the image ``name`` beside it; returns their names."""
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        # Lets the JPEG decoder downscale while decoding large photos
+        image.draft('RGB', (max(SIZES.values()) * 2,) * 2)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    names = []
+    for size, pixels in SIZES.items():
+        thumbnail = ImageOps.fit(image, (pixels, pixels), Image.Resampling.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            output = flatten(thumbnail) if image_format == 'JPEG' else thumbnail
+            buffer = BytesIO()
+            output.save(buffer, image_format, **options)
+            names.append(storage.save_beside(name, thumbnail_suffix(size, extension), ContentFile(buffer.getvalue())))
+    return names
+
+
+def thumbnail_urls(avatar, size):
+    """{extension: url} of one size of an avatar's thumbnails."""
+    return {
+        extension: avatar.storage.url(beside(avatar.name, thumbnail_suffix(size, extension)))
+        for extension in FORMATS
+    }
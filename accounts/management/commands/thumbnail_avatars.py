@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from accounts.tasks import generate_avatar_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Queues thumbnail generation for every avatar that has none yet (e.g. uploaded before thumbnails existed).'
+
+    def handle(self, *args, **options):
+        pending = (
+            User.objects.exclude(avatar='').exclude(avatar__isnull=True)
+            .filter(avatar_thumbnails_ready=False)
+            .values_list('id', 'avatar')
+        )
+        queued = 0
+        for user_id, name in pending.iterator():
+            generate_avatar_thumbnails.enqueue(user_id, name)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f'Queued thumbnails for {queued} avatars.'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:33
+
+import skillbridge.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobseekerprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=skillbridge.uploads.resume_storage, upload_to='resumes/'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=skillbridge.uploads.avatar_storage, upload_to='avatars/'),
+        ),
+    ]
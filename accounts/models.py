@@ -3,6 +3,7 @@ from django.db import models
 from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from skillbridge.uploads import avatar_storage, resume_storage
 
 class User(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -12,7 +13,9 @@ class User(AbstractUser):
     )
 
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default='job_seeker')
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar = models.ImageField(upload_to='avatars/', storage=avatar_storage, blank=True, null=True)
+    # Set by accounts.tasks once the avatar's thumbnails are stored (see accounts/avatars.py)
+    avatar_thumbnails_ready = models.BooleanField(default=False, editable=False)
 
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
@@ -21,7 +24,7 @@ class User(AbstractUser):
 
 class JobSeekerProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume = models.FileField(upload_to='resumes/', storage=resume_storage, blank=True, null=True)
     skills = models.TextField(blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
 
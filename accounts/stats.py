@@ -0,0 +1,191 @@
+"""
+Cached data for the homepage.
+
+Two layers, both in Django's cache framework:
+
+* The four headline counters live in their own cache keys. Job and User
+  signals increment/decrement them in place; course activity changes in
+  bulk (payments, expiry), so the course counter is dropped and recounted.
+  A missing key is recounted on the next read.
+
+* The featured/latest listings are rebuilt at most once per
+  ``HOME_CACHE_TTL``. A separate "fresh" marker expires after the TTL (or is
+  deleted by a signal); the data itself is kept longer so that, while one
+  request holds the rebuild lock, every other request keeps serving the
+  previous (stale) copy instead of hitting the database at the same time.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from courses import catalog, featured
+from courses.models import Course
+from jobs.models import Job
+from .models import User
+
+HOME_CACHE_TTL = getattr(settings, 'HOME_CACHE_TTL', 60)
+# Upper bound on how long an incrementally maintained counter may drift
+HOME_STATS_TTL = getattr(settings, 'HOME_STATS_TTL', 60 * 60)
+# How long a stale copy may be served while it is being rebuilt
+HOME_CACHE_GRACE = HOME_CACHE_TTL * 10
+REBUILD_LOCK_TIMEOUT = 30
+COLD_WAIT_SECONDS = 2.0
+
+CONTEXT_KEY = 'home:context'
+FRESH_KEY = 'home:context:fresh'
+LOCK_KEY = 'home:context:lock'
+COUNTER_KEY = 'home:stats:%s'
+
+
+def _count_jobs():
+    return Job.objects.count()
+
+
+def _count_courses():
+    return Course.objects.filter(is_active=True).count()
+
+
+def _count_recruiters():
+    return User.objects.filter(user_type='recruiter').count()
+
+
+def _count_seekers():
+    return User.objects.filter(user_type='job_seeker').count()
+
+
+COUNTERS = {
+    'jobs_count': _count_jobs,
+    'courses_count': _count_courses,
+    'recruiters_count': _count_recruiters,
+    'seekers_count': _count_seekers,
+}
+
+USER_TYPE_COUNTERS = {
+    'recruiter': 'recruiters_count',
+    'job_seeker': 'seekers_count',
+}
+
+
+# ----------------------------------------------------
+# COUNTERS
+# ----------------------------------------------------
+def get_stats():
+    keys = {name: COUNTER_KEY % name for name in COUNTERS}
+    cached = cache.get_many(keys.values())
+    stats, missing = {}, {}
+    for name, key in keys.items():
+        if key in cached:
+            stats[name] = cached[key]
+        else:
+            stats[name] = missing[key] = COUNTERS[name]()
+    if missing:
+        cache.set_many(missing, timeout=HOME_STATS_TTL)
+    return stats
+
+
+def bump(name, delta):
+    """Increment a counter in place; an absent key is left for the next read to recount."""
+    try:
+        cache.incr(COUNTER_KEY % name, delta)
+    except ValueError:
+        pass
+
+
+def forget(name):
+    cache.delete(COUNTER_KEY % name)
+
+
+# ----------------------------------------------------
+# FEATURED / LATEST LISTINGS
+# ----------------------------------------------------
+def build_listings():
+    courses = catalog.get_catalog()
+    return {
+        'featured_jobs': list(Job.objects.order_by('-posted_on')[:6]),
+        'featured_courses': featured.featured_courses(courses),
+        'latest_job': Job.objects.select_related('recruiter__recruiterprofile').order_by('-posted_on').first(),
+        'latest_course': courses[0] if courses else None,
+    }
+
+
+def get_listings():
+    listings = cache.get(CONTEXT_KEY)
+    if listings is not None and cache.get(FRESH_KEY):
+        return listings
+
+    # Stale or missing: only the request that wins the lock rebuilds
+    if cache.add(LOCK_KEY, True, timeout=REBUILD_LOCK_TIMEOUT):
+        try:
+            listings = build_listings()
+            cache.set(CONTEXT_KEY, listings, timeout=HOME_CACHE_TTL + HOME_CACHE_GRACE)
+            cache.set(FRESH_KEY, True, timeout=HOME_CACHE_TTL)
+        finally:
+            cache.delete(LOCK_KEY)
+        return listings
+
+    if listings is not None:
+        return listings
+
+    # Cold cache and someone else is rebuilding: wait briefly for them
+    deadline = time.monotonic() + COLD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        listings = cache.get(CONTEXT_KEY)
+        if listings is not None:
+            return listings
+    return build_listings()
+
+
+def mark_stale():
+    cache.delete(FRESH_KEY)
+
+
+def get_home_context():
+    context = dict(get_listings())
+    context['stats'] = get_stats()
+    return context
+
+
+# ----------------------------------------------------
+# SIGNALS
+# ----------------------------------------------------
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        bump('jobs_count', 1)
+        mark_stale()
+    elif update_fields is None or {'title', 'location', 'salary'} & set(update_fields):
+        mark_stale()
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    bump('jobs_count', -1)
+    mark_stale()
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    forget('courses_count')
+    mark_stale()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if created and instance.user_type in USER_TYPE_COUNTERS:
+        bump(USER_TYPE_COUNTERS[instance.user_type], 1)
+    elif not created and kwargs.get('update_fields') is None:
+        # user_type can change on a full save; recount rather than guess
+        for name in USER_TYPE_COUNTERS.values():
+            forget(name)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    if instance.user_type in USER_TYPE_COUNTERS:
+        bump(USER_TYPE_COUNTERS[instance.user_type], -1)
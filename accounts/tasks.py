@@ -0,0 +1,25 @@
+import logging
+
+from PIL import UnidentifiedImageError
+
+from tasks.queue import task
+from . import avatars
+from .models import User
+
+logger = logging.getLogger('skillbridge.tasks')
+
+
+@task(max_attempts=3)
+def generate_avatar_thumbnails(user_id, name):
+    user = User.objects.filter(pk=user_id, avatar=name).first()
+    if user is None:
+        # Avatar replaced (or user deleted) before the task ran
+        return
+    try:
+        avatars.make_thumbnails(user.avatar.storage, name)
+    except UnidentifiedImageError:
+        # Passed the upload checks but isn't a decodable image; retrying
+        # won't change that, and pages keep showing the original
+        logger.warning('Avatar %s of user %s is not a readable image', name, user_id)
+        return
+    User.objects.filter(pk=user_id, avatar=name).update(avatar_thumbnails_ready=True)
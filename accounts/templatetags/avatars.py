@@ -0,0 +1,34 @@
+from django import template
+from django.utils.html import format_html
+
+from accounts.avatars import SIZES, thumbnail_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_image(user, size='small', css_class=''):
+    """
+    ``<img>`` markup for ``user``'s avatar at ``size`` (see accounts/avatars.py),
+    or '' without one, so templates keep their own placeholder::
+
+        {% avatar_image convo.other_user "small" "h-14 w-14 rounded-full" as avatar %}
+        {% if avatar %}{{ avatar }}{% else %}...initial...{% endif %}
+    """
+    if user is None or not user.avatar:
+        return ''
+    if not user.avatar_thumbnails_ready:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="lazy">',
+            user.avatar.url, user.username, css_class,
+        )
+
+    urls = thumbnail_urls(user.avatar, size)
+    pixels = SIZES[size]
+    return format_html(
+        '<picture class="contents">'
+        '<source srcset="{}" type="image/webp">'
+        '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy">'
+        '</picture>',
+        urls['webp'], urls['jpg'], user.username, css_class, pixels, pixels,
+    )
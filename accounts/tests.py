@@ -1,3 +1,194 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from django.test import TestCase, Client, override_settings
+from jobs import recommend
+from jobs.models import Application, Job, SavedJob
+from skillbridge import uploads
+from skillbridge.query_budget import QueryRecorder
+from skillbridge.testing import QueryBudgetMixin, QueryPlanMixin
+from .models import User
+from . import avatars
+from .templatetags.avatars import avatar_image
+from . import stats
 
-# Create your tests here.
+
+class HomeStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        User.objects.create_user(username='seeker', password='password123')
+        self.client = Client()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_homepage_is_served_from_cache(self):
+        self.client.get('/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertEqual(response.context['stats']['recruiters_count'], 1)
+        self.assertEqual(response.context['stats']['seekers_count'], 1)
+
+    def test_signals_keep_counters_and_listings_current(self):
+        self.client.get('/')
+        Job.objects.create(recruiter=self.recruiter, title="Fresh Listing", description="...", location="Remote")
+        User.objects.create_user(username='seeker2', password='password123')
+
+        response = self.client.get('/')
+        self.assertEqual(response.context['stats']['jobs_count'], 1)
+        self.assertEqual(response.context['stats']['seekers_count'], 2)
+        self.assertContains(response, "Fresh Listing")
+
+    def test_stale_listings_served_while_another_request_rebuilds(self):
+        stats.get_listings()
+        stats.mark_stale()
+        cache.add(stats.LOCK_KEY, True)
+
+        with self.assertNumQueries(0):
+            listings = stats.get_listings()
+        self.assertEqual(listings['featured_jobs'], [])
+
+
+class QueryPlanTests(QueryPlanMixin, QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        seeker = User.objects.create_user(username='seeker', password='password123', user_type='job_seeker')
+        job = Job.objects.create(recruiter=recruiter, title="Indexed", description="...", location="Remote")
+        Application.objects.create(job=job, applicant=seeker)
+        SavedJob.objects.create(user=seeker, job=job)
+        self.client.login(username='seeker', password='password123')
+
+    def test_my_applications(self):
+        self.assertIndexedQueries('/accounts/applications/', ['jobs_application'])
+
+    def test_saved_jobs(self):
+        self.assertIndexedQueries('/accounts/saved-jobs/', ['jobs_savedjob'])
+
+    def test_listing_query_budgets(self):
+        self.assertQueryBudget('/accounts/applications/', 6)
+        self.assertQueryBudget('/accounts/saved-jobs/', 6)
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            User.objects.create_user(username=f'user{i}', password='password123')
+
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', Client().get('/'))
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGETS={'home': 1})
+    def test_reports_timing_and_logs_over_budget_views(self):
+        with self.assertLogs('skillbridge.queries', 'WARNING') as logs:
+            response = Client().get('/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries"$')
+        self.assertIn('home: ', logs.output[0])
+        self.assertIn('budget 1', logs.output[0])
+
+    def test_recorder_flags_repeated_selects(self):
+        with QueryRecorder() as recorder:
+            for pk in User.objects.values_list('pk', flat=True):
+                User.objects.get(pk=pk)
+            list(User.objects.filter(pk__in=[1, 2]))
+            list(User.objects.filter(pk__in=[1, 2, 3]))
+
+        self.assertEqual(recorder.count, 6)
+        self.assertEqual(list(recorder.duplicates().values()), [3])
+        self.assertEqual(len(recorder.duplicates(threshold=2)), 2)
+
+
+class DashboardQueryTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        recommend.reset_index()
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.seekers = [
+            User.objects.create_user(username=f'seeker{i}', password='password123', user_type='job_seeker')
+            for i in range(5)
+        ]
+        for i in range(5):
+            job = Job.objects.create(recruiter=self.recruiter, title=f"Job {i}", description="...", location="Remote")
+            for seeker in self.seekers:
+                Application.objects.create(job=job, applicant=seeker)
+
+    def test_jobseeker_pages(self):
+        self.client.login(username='seeker0', password='password123')
+        recommend.get_index()
+        # Reading the profile and applied jobs for the recommendations takes
+        # two of these; once the seeker's result is cached it is 7
+        self.assertQueryBudget('/accounts/dashboard/jobseeker/', 9)
+        self.assertQueryBudget('/accounts/dashboard/jobseeker/', 7)
+        application = Application.objects.filter(applicant=self.seekers[0]).first()
+        self.assertQueryBudget(f'/accounts/applications/{application.id}/', 5)
+
+    def test_recruiter_pages(self):
+        self.client.login(username='recruiter', password='password123')
+        self.assertQueryBudget('/accounts/dashboard/recruiter/', 7)
+        self.assertQueryBudget('/accounts/recruiter/applications/', 6)
+        self.assertQueryBudget(f'/accounts/seeker-profile/{self.seekers[0].id}/', 5)
+
+
+class ProfileUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='seeker', password='password123', user_type='job_seeker')
+        self.client.login(username='seeker', password='password123')
+
+    def edit(self, **files):
+        return self.client.post('/accounts/profile/edit/', {'username': 'renamed', 'email': 'a@b.c', **files})
+
+    def png(self, size=(600, 400)):
+        buffer = BytesIO()
+        Image.new('RGBA', size, (20, 120, 200, 128)).save(buffer, 'PNG')
+        return SimpleUploadedFile('me.PNG', buffer.getvalue(), 'image/png')
+
+    def test_avatar_is_stored_by_content_with_thumbnails(self):
+        self.edit(avatar=self.png())
+        self.user.refresh_from_db()
+        self.assertRegex(self.user.avatar.name, r'^avatars/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertTrue(self.user.avatar_thumbnails_ready)
+
+        storage = self.user.avatar.storage
+        for size, pixels in avatars.SIZES.items():
+            for extension in avatars.FORMATS:
+                name = self.user.avatar.name.replace('.png', f'_{size}.{extension}')
+                with storage.open(name, 'rb') as thumbnail:
+                    self.assertEqual(Image.open(thumbnail).size, (pixels, pixels))
+
+        response = self.client.get('/accounts/profile/')
+        self.assertContains(response, '_medium.webp" type="image/webp"')
+        self.assertContains(response, '_small.jpg"')  # navbar
+
+    def test_avatar_tag_falls_back(self):
+        self.assertEqual(avatar_image(self.user), '')
+
+        self.user.avatar = 'avatars/ab/ab.png'
+        self.assertIn('src="/media/avatars/ab/ab.png"', avatar_image(self.user, 'small', 'w-8'))
+
+    def test_rejected_upload_changes_nothing(self):
+        response = self.edit(avatar=SimpleUploadedFile('me.png', b'GIF89a', 'image/png'))
+        self.assertRedirects(response, '/accounts/profile/edit/', fetch_redirect_response=False)
+
+        # Over every limit: dropped from the Content-Length alone
+        with mock.patch.object(uploads, 'DEFAULT_MAX_SIZE', 0), \
+                mock.patch.dict(uploads.UPLOAD_RULES, {'resume': {'max_size': 0, 'types': {'.pdf': (b'%PDF',)}}}):
+            response = self.edit(resume=SimpleUploadedFile('cv.pdf', b'%PDF' * 300_000, 'application/pdf'))
+        self.assertRedirects(response, '/accounts/profile/edit/', fetch_redirect_response=False)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.username, 'seeker')
+        self.assertFalse(self.user.avatar)
+        self.assertFalse(self.user.jobseekerprofile.resume)
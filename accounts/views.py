@@ -4,49 +4,27 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from django.http import HttpResponse
+from django.db.models import Count, Q
 
 
 from .forms import JobSeekerSignUpForm, RecruiterSignUpForm, LoginForm
 
 # ✅ IMPORT MODELS (THIS WAS MISSING)
 from jobs.models import Job, Application, SavedJob
+from jobs import recommend
 from .models import User
+from .stats import get_home_context
+from .tasks import generate_avatar_thumbnails
+from jobs.serializers import serialize_application, serialize_saved_job
+from skillbridge.pagination import paginate, render_page
+from skillbridge.uploads import upload_error
 
 
-from django.utils import timezone
-from courses.models import Course
-
 # ------------------ HOME ------------------
 def home(request):
-    # Featured Jobs (Latest 3)
-    featured_jobs = Job.objects.order_by('-posted_on')[:6]
-
-    # Featured Courses (Active & Not Expired, Latest 6)
-    # Note: Complex verified featured logic can be added here. 
-    # For now, simplest robust query:
-    featured_courses = Course.objects.filter(
-        is_active=True, 
-        expires_on__gte=timezone.now().date()
-    ).order_by('-created_at')[:6]
-
-
-
-    # Dynamic Data for Hero/Stats
-    latest_job = Job.objects.order_by('-posted_on').first()
-    latest_course = Course.objects.filter(is_active=True).order_by('-created_at').first()
-    
-    context = {
-        'featured_jobs': featured_jobs,
-        'featured_courses': featured_courses,
-        'latest_job': latest_job,
-        'latest_course': latest_course,
-        'stats': {
-            'jobs_count': Job.objects.count(),
-            'courses_count': Course.objects.filter(is_active=True).count(),
-            'recruiters_count': User.objects.filter(user_type='recruiter').count(),
-            'seekers_count': User.objects.filter(user_type='job_seeker').count(),
-        }
-    }
+    # Featured/latest listings and hero stats come from the cache and are
+    # kept current by signals (see accounts/stats.py)
+    context = get_home_context()
 
     return render(request, 'accounts/home.html', context)
 
@@ -154,7 +132,7 @@ def jobseeker_dashboard(request):
         return HttpResponseForbidden("Access denied: Only Job Seekers can view this page.")
 
     # All applications by this user
-    applications = Application.objects.filter(applicant=request.user).order_by('-applied_on')
+    applications = Application.objects.for_applicant_listing(request.user).order_by('-applied_on', '-id')
 
     # Saved jobs
     saved_jobs = SavedJob.objects.filter(user=request.user)
@@ -168,7 +146,8 @@ def jobseeker_dashboard(request):
     recent_applications = applications[:5]
 
     # Recommended jobs (simple logic: show jobs not applied to)
-    recommended_jobs = Job.objects.exclude(applications__applicant=request.user).order_by('-posted_on')[:4]
+    # Matched against the seeker's skills (see jobs/recommend.py)
+    recommended_jobs = recommend.recommended_jobs(request.user)
 
     context = {
         "applied_jobs_count": applied_jobs_count,
@@ -188,35 +167,29 @@ def recruiter_dashboard(request):
         return HttpResponseForbidden("Access denied: Only Recruiters can view this page.")
 
     # Core Stats
-    posted_jobs = Job.objects.filter(recruiter=request.user)
-    job_count = posted_jobs.count()
+    job_count = Job.objects.filter(recruiter=request.user).count()
 
     # All applications for jobs posted by this recruiter
     # We can query Application directly by filtering on job__recruiter
-    recruiter_apps = Application.objects.filter(job__recruiter=request.user)
-    total_applications = recruiter_apps.count()
+    recruiter_apps = Application.objects.for_recruiter_listing(request.user)
 
-    # New applications today
+    # Total and new today in one pass
+    # (applied_on__date since applied_on is DateTimeField)
     from django.utils import timezone
     today = timezone.now().date()
-    # Filter by applied_on__date since applied_on is DateTimeField
-    new_today = recruiter_apps.filter(applied_on__date=today).count()
+    totals = recruiter_apps.aggregate(
+        total=Count('id'),
+        new_today=Count('id', filter=Q(applied_on__date=today)),
+    )
 
     # Recent applications (latest 5)
-    recent_apps = recruiter_apps.order_by('-applied_on')[:5]
-
-    try:
-        from messaging.models import Notification
-        unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-    except ImportError:
-        unread_count = 0
+    recent_apps = recruiter_apps.order_by('-applied_on', '-id')[:5]
 
     context = {
         "job_count": job_count,
-        "total_applications": total_applications,
-        "new_today": new_today,
+        "total_applications": totals['total'],
+        "new_today": totals['new_today'],
         "recent_apps": recent_apps,
-        "unread_count": unread_count,
     }
 
     return render(request, 'accounts/recruiter_dashboard.html', context)
@@ -226,11 +199,12 @@ def saved_jobs_view(request):
     if request.user.user_type != 'job_seeker':
         return HttpResponseForbidden("Access denied: Only Job Seekers can view this page.")
 
-    saved = SavedJob.objects.filter(user=request.user).select_related("job")
+    saved = SavedJob.objects.for_user(request.user)
+    page = paginate(request, saved, ("-saved_on", "-id"))
 
-    return render(request, "accounts/saved_jobs.html", {
-        "saved_jobs": saved
-    })
+    return render_page(request, "accounts/saved_jobs.html", {
+        "saved_jobs": page
+    }, page, serialize_saved_job)
 
 @login_required
 def recruiter_applications(request):
@@ -238,11 +212,12 @@ def recruiter_applications(request):
         return HttpResponseForbidden("Access denied. Recruiters only.")
     
     # Fetch all applications for jobs posted by this recruiter
-    applications = Application.objects.filter(job__recruiter=request.user).select_related('job', 'applicant').order_by('-applied_on')
-    
-    return render(request, "accounts/recruiter_applications.html", {
-        "applications": applications
-    })
+    applications = Application.objects.for_recruiter_listing(request.user)
+    page = paginate(request, applications, ('-applied_on', '-id'))
+
+    return render_page(request, "accounts/recruiter_applications.html", {
+        "applications": page
+    }, page, serialize_application)
 
 def messages_placeholder(request):
     return redirect('inbox')
@@ -254,13 +229,25 @@ def profile_view(request):
 @login_required
 def profile_edit(request):
     if request.method == "POST":
+        # Rejected while streaming (size or type), see skillbridge/uploads.py
+        for field in ("avatar", "resume"):
+            error = upload_error(request, field)
+            if error:
+                messages.error(request, error)
+                return redirect("profile_edit")
+
         request.user.username = request.POST.get("username")
         request.user.email = request.POST.get("email")
         
-        if "avatar" in request.FILES:
+        avatar_changed = "avatar" in request.FILES
+        if avatar_changed:
             request.user.avatar = request.FILES["avatar"]
+            request.user.avatar_thumbnails_ready = False
             
         request.user.save()
+        if avatar_changed:
+            # Until the thumbnails exist, pages show the uploaded image
+            generate_avatar_thumbnails.enqueue(request.user.id, request.user.avatar.name)
         
         # Update extra profile fields
         if request.user.user_type == 'job_seeker':
@@ -286,7 +273,7 @@ def profile_edit(request):
 @login_required
 def application_detail(request, application_id):
     application = get_object_or_404(
-        Application,
+        Application.objects.for_detail(),
         id=application_id,
         applicant=request.user
     )
@@ -302,11 +289,12 @@ def my_applications(request):
     if request.user.user_type != 'job_seeker':
         return HttpResponseForbidden("Access denied. Job Seekers only.")
 
-    applications = Application.objects.filter(applicant=request.user).select_related('job', 'job__recruiter').order_by('-applied_on')
+    applications = Application.objects.for_applicant_listing(request.user)
+    page = paginate(request, applications, ('-applied_on', '-id'))
 
-    return render(request, "accounts/my_applications.html", {
-        "applications": applications
-    })
+    return render_page(request, "accounts/my_applications.html", {
+        "applications": page
+    }, page, serialize_application)
 
 @login_required
 def seeker_profile(request, user_id):
@@ -315,7 +303,7 @@ def seeker_profile(request, user_id):
         messages.error(request, "Access denied. Recruiters only.")
         return redirect('home')
 
-    seeker = get_object_or_404(User, id=user_id)
+    seeker = get_object_or_404(User.objects.select_related('jobseekerprofile'), id=user_id)
     
     # Optional: Check if this seeker has applied to any of the recruiter's jobs?
     # For now, open access for recruiters is fine as per requirements.
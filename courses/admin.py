@@ -1,7 +1,8 @@
 # courses/admin.py
 from django.contrib import admin
-from .models import Course, CourseListingPlan, CoursePayment
+from .models import Course, CourseListingPlan, CoursePayment, FeaturedCourse
 
 admin.site.register(Course)
 admin.site.register(CourseListingPlan)
 admin.site.register(CoursePayment)
+admin.site.register(FeaturedCourse)
@@ -0,0 +1,62 @@
+"""
+The cached list of courses on sale: active and not past ``expires_on``,
+newest first. It backs ``course_list`` and the homepage's featured and
+latest courses.
+
+The list changes when a course is written, or when a listed course's last
+day ends. Course saves and deletes that touch a listed field or status
+(courses.signals) and the expiry task's bulk UPDATE bump the CatalogVersion
+row, seeded by migration, in the same transaction.
+Each cached copy is tagged with the version it was built from, so one
+primary-key lookup tells any process, web or worker, whether its copy is
+still good. A copy is also kept no later than the end of the soonest
+expiry day among its courses, and never longer than
+``COURSE_CATALOG_MAX_TTL``.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion, Course
+
+CATALOG_KEY = 'courses:catalog'
+COURSE_CATALOG_MAX_TTL = getattr(settings, 'COURSE_CATALOG_MAX_TTL', 6 * 60 * 60)
+
+
+def build(today=None):
+    today = today or timezone.now().date()
+    return list(
+        Course.objects.filter(is_active=True, expires_on__gte=today).order_by('-created_at')
+    )
+
+
+def ttl(courses, now=None):
+    """Seconds until the first listed course's expiry date is over (UTC, like ``build``)."""
+    now = now or timezone.now()
+    if not courses:
+        return COURSE_CATALOG_MAX_TTL
+    last_day = min(course.expires_on for course in courses)
+    ends = datetime.combine(last_day + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+    return max(1, min(COURSE_CATALOG_MAX_TTL, int((ends - now).total_seconds())))
+
+
+def version():
+    return CatalogVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def changed():
+    """Mark every cached copy out of date, as of the caller's commit."""
+    CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1)
+
+
+def get_catalog():
+    current = version()
+    cached = cache.get(CATALOG_KEY)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    courses = build()
+    cache.set(CATALOG_KEY, (current, courses), timeout=ttl(courses))
+    return courses
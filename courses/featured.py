@@ -0,0 +1,107 @@
+"""
+The featured-course slate: which live courses the homepage features, and
+in what order, with course_list putting the same courses first.
+
+Only courses with an active payment for a featured plan qualify. Each
+such payment scores
+
+    TIER_WEIGHT * price of its plan relative to the dearest featured plan
+  + REMAINING_WEIGHT * share of the plan's days still to run
+  + RECENCY_WEIGHT * 0.5 ** (days since payment / RECENCY_HALF_LIFE)
+
+and a course ranks by its best payment. ``refresh`` computes the slate
+and materializes it as FeaturedCourse rows. It runs with the periodic
+expiry task, and after a featured plan is bought, both in the worker, so
+pages read the table itself (a handful of rows by position) rather than
+a per-process cache the worker can't update. Requests never sort courses
+or payments.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import plans
+from .models import CoursePayment, FeaturedCourse
+
+SLATE_SIZE = getattr(settings, 'FEATURED_COURSE_COUNT', 6)
+
+TIER_WEIGHT = 3.0
+REMAINING_WEIGHT = 1.0
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE = 7  # days
+
+
+def score(plan, top_price, start_date, end_date, now):
+    remaining = (end_date - now).total_seconds() / (plan.duration_days * 86400 or 1)
+    age = (now - start_date).total_seconds() / 86400
+    return (
+        TIER_WEIGHT * float(plan.price / top_price if top_price else 1)
+        + REMAINING_WEIGHT * min(max(remaining, 0.0), 1.0)
+        + RECENCY_WEIGHT * 0.5 ** (max(age, 0.0) / RECENCY_HALF_LIFE)
+    )
+
+
+def rank(now=None):
+    """The slate as [(course_id, plan, score)], best first."""
+    now = now or timezone.now()
+    featured_plans = {plan.id: plan for plan in plans.get_registry().by_id.values() if plan.is_featured}
+    if not featured_plans:
+        return []
+    top_price = max(plan.price for plan in featured_plans.values())
+
+    payments = CoursePayment.objects.filter(
+        is_active=True, end_date__gte=now, plan_id__in=list(featured_plans),
+        course__is_active=True, course__expires_on__gte=now.date(),
+    ).values_list('course_id', 'plan_id', 'start_date', 'end_date')
+
+    best = {}
+    for course_id, plan_id, start_date, end_date in payments:
+        plan = featured_plans[plan_id]
+        value = score(plan, top_price, start_date, end_date, now)
+        if course_id not in best or value > best[course_id][1]:
+            best[course_id] = (plan, value)
+
+    # Newer courses (higher ids) first among equal scores
+    ranked = sorted(best.items(), key=lambda item: (-item[1][1], -item[0]))[:SLATE_SIZE]
+    return [(course_id, plan, value) for course_id, (plan, value) in ranked]
+
+
+def refresh(now=None):
+    """Recompute and store the slate; returns [(course_id, plan name)] in order."""
+    now = now or timezone.now()
+    slate = rank(now)
+    with transaction.atomic():
+        FeaturedCourse.objects.all().delete()
+        FeaturedCourse.objects.bulk_create([
+            FeaturedCourse(position=position, course_id=course_id, plan_name=plan.name,
+                           score=value, refreshed_at=now)
+            for position, (course_id, plan, value) in enumerate(slate)
+        ])
+    return [(course_id, plan.name) for course_id, plan, _ in slate]
+
+
+def get_placements():
+    return list(FeaturedCourse.objects.values_list('course_id', 'plan_name'))
+
+
+def featured_courses(courses):
+    """
+    The featured ones among ``courses`` (the catalog), in slate order, each
+    with ``featured_plan`` set. A course that has since stopped being
+    listed simply drops out.
+    """
+    by_id = {course.pk: course for course in courses}
+    featured = []
+    for course_id, plan_name in get_placements():
+        course = by_id.get(course_id)
+        if course is not None:
+            course.featured_plan = plan_name
+            featured.append(course)
+    return featured
+
+
+def featured_first(courses):
+    """``courses`` with the featured ones moved to the front, in slate order."""
+    featured = featured_courses(courses)
+    chosen = {course.pk for course in featured}
+    return featured + [course for course in courses if course.pk not in chosen]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursepayment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:54
+
+from django.db import migrations
+
+# The plans checkout used to create on first purchase (and hardcode)
+PLANS = [
+    # duration_days, name, price, is_featured
+    (7, 'Basic', 499, False),
+    (15, 'Standard', 899, True),
+    (30, 'Premium', 1499, True),
+]
+
+
+def seed_plans(apps, schema_editor):
+    CourseListingPlan = apps.get_model('courses', 'CourseListingPlan')
+    for days, name, price, featured in PLANS:
+        CourseListingPlan.objects.get_or_create(
+            duration_days=days,
+            defaults={'name': name, 'price': price, 'is_featured': featured},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_payment_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_plans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_seed_listing_plans'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeaturedCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(unique=True)),
+                ('plan_name', models.CharField(max_length=100)),
+                ('score', models.FloatField()),
+                ('refreshed_at', models.DateTimeField()),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='featured_slot', to='courses.course')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+    ]
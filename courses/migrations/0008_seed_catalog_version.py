@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:05
+
+from django.db import migrations
+
+
+def seed_version(apps, schema_editor):
+    CatalogVersion = apps.get_model('courses', 'CatalogVersion')
+    CatalogVersion.objects.get_or_create(pk=1, defaults={'version': 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_version, migrations.RunPython.noop),
+    ]
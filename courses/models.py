@@ -5,8 +5,18 @@ from datetime import timedelta
 
 User = settings.AUTH_USER_MODEL
 
+# Course.catalog_state of a course whose catalog fields aren't all loaded
+UNKNOWN = object()
+
 
 class Course(models.Model):
+    # What the course catalog (courses/catalog.py) shows of a course, or
+    # decides its listing by
+    CATALOG_FIELDS = (
+        'title', 'description', 'instructor', 'duration_text', 'duration_days',
+        'external_link', 'is_active', 'expires_on',
+    )
+
     provider = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -27,6 +37,41 @@ class Course(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Only active courses are ever listed or expired, so both
+            # indexes skip the (growing) set of inactive ones
+            models.Index(fields=['expires_on'], condition=models.Q(is_active=True), name='course_active_expires_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='course_active_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        course = super().from_db(db, field_names, values)
+        course.loaded_catalog_state = course.catalog_state()
+        return course
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.loaded_catalog_state = self.catalog_state()
+
+    def catalog_state(self):
+        """
+        The catalog fields, None while the course isn't listed, or
+        ``UNKNOWN`` when some of them weren't loaded.
+        """
+        if any(name not in self.__dict__ for name in self.CATALOG_FIELDS):
+            return UNKNOWN
+        if not self.is_active:
+            return None
+        return tuple(self.__dict__[name] for name in self.CATALOG_FIELDS)
+
+    def catalog_changed(self):
+        """Whether saving this course as it is now changes the catalog."""
+        state = self.catalog_state()
+        loaded = getattr(self, 'loaded_catalog_state', UNKNOWN)
+        return state is UNKNOWN or loaded is UNKNOWN or state != loaded
+
     def update_status(self):
         active_payment = self.coursepayment_set.filter(
             is_active=True,
@@ -45,6 +90,17 @@ class Course(models.Model):
         return self.title
 
 
+class CatalogVersion(models.Model):
+    """
+    A single row counting changes to the listed courses, so every process
+    can tell its cached catalog is out of date (see courses.catalog).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
+
 class CourseListingPlan(models.Model):
     name = models.CharField(max_length=100)
     duration_days = models.PositiveIntegerField()
@@ -65,12 +121,36 @@ class CoursePayment(models.Model):
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField()
     is_active = models.BooleanField(default=True)
+    # The checkout form's token (see courses.payments), so a resubmitted
+    # form can't pay twice
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, update_course=True, **kwargs):
         if not self.end_date:
             self.end_date = now() + timedelta(days=self.plan.duration_days)
         super().save(*args, **kwargs)
-        self.course.update_status()
+        if update_course:
+            # Activating the course (and extending its expiry) runs in the background
+            from .tasks import update_course_status
+            update_course_status.enqueue(self.course_id)
 
     def __str__(self):
         return f"{self.course.title} ({self.plan.name})"
+
+
+class FeaturedCourse(models.Model):
+    """
+    One slot of the homepage's featured-course slate, materialized by
+    courses.featured.refresh. Rows are replaced wholesale on each refresh.
+    """
+    position = models.PositiveSmallIntegerField(unique=True)
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name="featured_slot")
+    plan_name = models.CharField(max_length=100)
+    score = models.FloatField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["position"]
+
+    def __str__(self):
+        return f"#{self.position}: {self.course_id}"
@@ -0,0 +1,95 @@
+"""
+Activating a course listing once its (mock) payment goes through.
+
+``activate_listing`` does it in one transaction: it locks the course row
+with SELECT ... FOR UPDATE, records the CoursePayment and saves the
+course once with its new expiry. Each checkout page carries a fresh
+``payment_token`` that is stored on the payment (unique), so a
+double-submitted or retried form finds the payment it already made
+instead of paying twice. Concurrent submits queue on the course lock;
+on databases without row locks the unique key still stops the second
+one.
+
+Plans come from the in-memory registry in courses.plans.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import plans
+from .models import Course, CoursePayment
+
+logger = logging.getLogger('skillbridge.payments')
+
+
+class PaymentError(Exception):
+    pass
+
+
+def new_token():
+    return uuid.uuid4().hex
+
+
+def get_plan(days):
+    """The plan lasting ``days``, raising PaymentError if none does."""
+    plan = plans.get(days)
+    if plan is None:
+        raise PaymentError("Please select a plan.")
+    return plan
+
+
+def activate_listing(course, provider, days, token):
+    """
+    Pay for ``days`` of listing and activate ``course``; returns the
+    CoursePayment, the existing one if ``token`` was already used.
+    """
+    if not token:
+        raise PaymentError("This checkout has expired, please choose a plan again.")
+    plan = get_plan(days)
+
+    try:
+        with transaction.atomic():
+            course = Course.objects.select_for_update().get(pk=course.pk)
+            payment = CoursePayment.objects.select_related('plan').filter(idempotency_key=token).first()
+            if payment is not None:
+                return _check_replay(payment, course)
+
+            now = timezone.now()
+            payment = CoursePayment(
+                course=course, provider=provider, plan_id=plan.id, paid_amount=plan.price,
+                end_date=now + timedelta(days=plan.duration_days), idempotency_key=token,
+            )
+            payment.save(update_course=False)
+
+            # A plan bought while the course is still listed never shortens it
+            expires_on = payment.end_date.date()
+            if course.is_active and course.expires_on and course.expires_on > expires_on:
+                expires_on = course.expires_on
+            course.is_active, course.expires_on = True, expires_on
+            course.save(update_fields=['is_active', 'expires_on'])
+            if plan.is_featured:
+                # Queued with the payment, so it sees the course as paid
+                from .tasks import refresh_featured_courses
+                refresh_featured_courses.enqueue()
+    except IntegrityError as error:
+        # Lost a race for the token to a submit that committed first?
+        payment = CoursePayment.objects.select_related('course', 'plan').filter(idempotency_key=token).first()
+        if payment is None:
+            logger.warning('Payment for course #%s failed', course.pk, exc_info=True)
+            # Most likely a plan deleted since this process loaded them
+            plans.reset()
+            raise PaymentError("Your payment couldn't be completed, please choose a plan again.") from error
+        return _check_replay(payment, payment.course)
+
+    payment.course = course
+    return payment
+
+
+def _check_replay(payment, course):
+    if payment.course_id != course.pk:
+        raise PaymentError("This checkout belongs to another course.")
+    payment.course = course
+    return payment
@@ -0,0 +1,103 @@
+"""
+The listing plans on sale (CourseListingPlan rows), held in memory.
+
+Plans change a few times a year and are read on every step of checkout,
+so each process keeps an immutable ``PlanRegistry`` snapshot of them and
+looking one up costs no query. Saving or deleting a plan bumps a version
+in the cache (on commit), which the process that did it (and, with a
+shared cache, every process) picks up on its next lookup. Other processes
+reload once their snapshot is ``PLAN_REGISTRY_MAX_AGE`` seconds old. The
+snapshot is loaded on first use rather than in ``AppConfig.ready``, where
+the database may not exist yet (e.g. during ``migrate``).
+"""
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "courses:plans-version"
+MAX_AGE = getattr(settings, 'PLAN_REGISTRY_MAX_AGE', 60)
+
+
+@dataclass(frozen=True)
+class Plan:
+    id: int
+    name: str
+    duration_days: int
+    price: Decimal
+    is_featured: bool
+
+
+class PlanRegistry:
+    def __init__(self, plans, version=None):
+        self.plans = tuple(sorted(plans, key=lambda plan: (plan.duration_days, plan.id)))
+        self.version = version
+        self.built_at = time.monotonic()
+        by_days = {}
+        for plan in self.plans:
+            # Two plans of the same length: the older one is sold
+            by_days.setdefault(plan.duration_days, plan)
+        self.by_days = MappingProxyType(by_days)
+        self.by_id = MappingProxyType({plan.id: plan for plan in self.plans})
+
+    def __iter__(self):
+        return iter(self.by_days.values())
+
+    def __len__(self):
+        return len(self.by_days)
+
+    def get(self, days):
+        """The plan lasting ``days`` (a number or its string), or None."""
+        try:
+            return self.by_days.get(int(days))
+        except (TypeError, ValueError):
+            return None
+
+
+_registry = None
+_lock = threading.Lock()
+
+
+def plans_version():
+    return cache.get_or_set(VERSION_KEY, 0, timeout=None)
+
+
+def plans_changed():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def get_registry():
+    global _registry
+    version = plans_version()
+    current = _registry
+    if current is not None and current.version == version and time.monotonic() - current.built_at < MAX_AGE:
+        return current
+
+    with _lock:
+        if _registry is current:
+            from .models import CourseListingPlan
+
+            _registry = PlanRegistry(
+                [Plan(**values) for values in CourseListingPlan.objects.values(
+                    'id', 'name', 'duration_days', 'price', 'is_featured',
+                )],
+                version,
+            )
+        return _registry
+
+
+def get(days):
+    return get_registry().get(days)
+
+
+def reset():
+    global _registry
+    with _lock:
+        _registry = None
@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import UNKNOWN, Course, CourseListingPlan
+from . import catalog, plans
+
+
+# Covers Course.update_status (which saves the course) and checkout. The
+# version is bumped in the saving transaction, and only when the save
+# changes what the catalog lists; a payment alone doesn't change the
+# listing until its course is activated.
+@receiver(post_save, sender=Course)
+def course_catalog_changed(sender, instance, created, update_fields=None, **kwargs):
+    fields = set(Course.CATALOG_FIELDS)
+    if update_fields is not None and not fields & set(update_fields):
+        return
+    changed = instance.is_active if created else instance.catalog_changed()
+
+    # Later saves of this instance compare against what is now stored
+    if update_fields is None or fields <= set(update_fields):
+        instance.loaded_catalog_state = instance.catalog_state()
+    else:
+        instance.loaded_catalog_state = UNKNOWN
+
+    if changed:
+        catalog.changed()
+
+
+@receiver(post_delete, sender=Course)
+def course_catalog_deleted(sender, instance, **kwargs):
+    if getattr(instance, 'loaded_catalog_state', UNKNOWN) is not None:
+        catalog.changed()
+
+
+@receiver(post_save, sender=CourseListingPlan)
+@receiver(post_delete, sender=CourseListingPlan)
+def listing_plan_changed(sender, **kwargs):
+    transaction.on_commit(plans.plans_changed)
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import stats
+from tasks.queue import task
+from . import catalog, featured
+from .models import Course
+
+EXPIRY_INTERVAL = timedelta(seconds=getattr(settings, 'COURSE_EXPIRY_INTERVAL', 15 * 60))
+
+
+@task
+def update_course_status(course_id):
+    course = Course.objects.filter(pk=course_id).first()
+    if course is not None:
+        course.update_status()
+
+
+@task(every=EXPIRY_INTERVAL)
+def expire_courses():
+    """Deactivate every course past its expiry date in one UPDATE; returns how many."""
+    expired = Course.objects.filter(is_active=True, expires_on__lt=timezone.now().date()).update(is_active=False)
+    if expired:
+        # update() skips signals, so refresh the homepage stats and the
+        # catalog by hand
+        stats.forget('courses_count')
+        stats.mark_stale()
+        catalog.changed()
+    return expired
+
+
+# On the expiry schedule, though independent of it: the slate only ever
+# takes courses that are still live
+@task(every=EXPIRY_INTERVAL)
+def refresh_featured_courses():
+    """Rebuild the featured-course slate; returns the course ids in order."""
+    placements = featured.refresh()
+    transaction.on_commit(stats.mark_stale)
+    return [course_id for course_id, _ in placements]
@@ -1,3 +1,287 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from accounts.models import User
+from skillbridge.query_budget import QueryRecorder
+from skillbridge.testing import QueryBudgetMixin, QueryPlanMixin
+from . import catalog, featured, payments, plans
+from .models import Course, CourseListingPlan, CoursePayment, FeaturedCourse
+from .tasks import expire_courses, refresh_featured_courses
 
-# Create your tests here.
+
+class QueryPlanTests(QueryPlanMixin, TestCase):
+    def test_course_list(self):
+        cache.clear()
+        provider = User.objects.create_user(username='provider', password='password123')
+        Course.objects.create(
+            provider=provider, title="Indexed", description="...", instructor="Someone",
+            is_active=True, expires_on=timezone.now().date() + timedelta(days=7),
+        )
+        self.client.login(username='provider', password='password123')
+        self.assertIndexedQueries('/courses/', ['courses_course'])
+
+
+class CourseExpiryTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.provider = User.objects.create_user(username='provider', password='password123')
+        today = timezone.now().date()
+        for days, active in [(5, True), (-1, True), (-3, True), (-3, False), (None, False)]:
+            Course.objects.create(
+                provider=self.provider, title=f"Course {days}", description="...", instructor="Someone",
+                is_active=active, expires_on=today + timedelta(days=days) if days is not None else None,
+            )
+        self.client.login(username='provider', password='password123')
+
+    def test_dashboard_is_read_only_and_counts_past_due_as_expired(self):
+        with QueryRecorder() as recorder:
+            response = self.client.get('/courses/provider/dashboard/')
+        self.assertFalse([sql for sql, _ in recorder.queries if sql.startswith('UPDATE')])
+        self.assertEqual(
+            (response.context['total_courses'], response.context['active_courses'], response.context['expired_courses']),
+            (5, 1, 4),
+        )
+        self.assertEqual([course.is_live for course in response.context['courses']].count(True), 1)
+        # session, user, the aggregate, the course list and the navbar counts
+        self.assertQueryBudget('/courses/provider/dashboard/', 6)
+
+    def test_expiry_is_one_update(self):
+        # and the catalog version bump
+        with self.assertNumQueries(2):
+            self.assertEqual(expire_courses(), 2)
+        self.assertEqual(Course.objects.filter(is_active=True).count(), 1)
+        self.assertEqual(expire_courses(), 0)
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.provider = User.objects.create_user(username='provider', password='password123')
+        self.today = timezone.now().date()
+
+    def add_course(self, title, days, active=True):
+        return Course.objects.create(
+            provider=self.provider, title=title, description="...", instructor="Someone",
+            is_active=active, expires_on=self.today + timedelta(days=days),
+        )
+
+    def test_ttl_runs_to_the_end_of_the_soonest_expiry_day(self):
+        now = datetime(2026, 3, 1, 22, 0, tzinfo=dt_timezone.utc)
+        soon = Course(expires_on=now.date())
+        later = Course(expires_on=now.date() + timedelta(days=3))
+        self.assertEqual(catalog.ttl([later, soon], now=now), 2 * 60 * 60)
+        self.assertEqual(catalog.ttl([later], now=now), catalog.COURSE_CATALOG_MAX_TTL)
+        self.assertEqual(catalog.ttl([], now=now), catalog.COURSE_CATALOG_MAX_TTL)
+
+    def test_listing_is_served_from_cache(self):
+        self.add_course("Newer", 5)
+        self.add_course("Gone", -1)
+        self.add_course("Off", 5, active=False)
+        self.assertEqual([course.title for course in catalog.get_catalog()], ["Newer"])
+        # Only the version check
+        with self.assertNumQueries(1):
+            self.assertEqual([course.title for course in catalog.get_catalog()], ["Newer"])
+
+    def test_only_catalog_changes_bump_the_version(self):
+        listed = self.add_course("Listed", 5)
+        start = catalog.version()
+
+        listed.save()
+        Course.objects.get(pk=listed.pk).save()
+        listed.save(update_fields=['provider'])
+        unlisted = self.add_course("Off", 5, active=False)
+        unlisted.title = "Still off"
+        unlisted.save()
+        self.assertEqual(catalog.version(), start)
+
+        listed.title = "Renamed"
+        listed.save()
+        Course.objects.get(pk=listed.pk).delete()
+        Course.objects.get(pk=unlisted.pk).delete()
+        self.assertEqual(catalog.version(), start + 2)
+
+    def test_changes_in_another_process_invalidate(self):
+        course = self.add_course("Pending", 5, active=False)
+        self.assertEqual(catalog.get_catalog(), [])
+
+        # The worker has a cache of its own
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker',
+        }}):
+            plan = CourseListingPlan.objects.get(duration_days=7)
+            CoursePayment.objects.create(course=course, provider=self.provider, plan=plan, paid_amount=10)
+        self.assertEqual([c.title for c in catalog.get_catalog()], ["Pending"])
+
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker',
+        }}):
+            Course.objects.filter(pk=course.pk).update(expires_on=self.today - timedelta(days=1))
+            expire_courses()
+        self.assertEqual(catalog.get_catalog(), [])
+
+
+class PaymentCheckoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        plans.reset()
+        self.provider = User.objects.create_user(username='provider', password='password123')
+        self.course = Course.objects.create(
+            provider=self.provider, title="Unpaid", description="...", instructor="Someone",
+        )
+        self.client.login(username='provider', password='password123')
+        self.url = f'/courses/payment/checkout/{self.course.id}/'
+
+    def checkout(self, plan=15):
+        response = self.client.post(self.url, {'plan': plan})
+        self.assertEqual(response.status_code, 200)
+        return response.context['payment_token']
+
+    def pay(self, token, plan=15):
+        return self.client.post(self.url, {'plan': plan, 'payment_token': token, 'process_payment': ''})
+
+    def test_payment_activates_the_course(self):
+        response = self.pay(self.checkout())
+        self.assertEqual(response.status_code, 200)
+        self.course.refresh_from_db()
+        self.assertTrue(self.course.is_active)
+        self.assertEqual(self.course.expires_on, (timezone.now() + timedelta(days=15)).date())
+        payment = CoursePayment.objects.get()
+        self.assertEqual((payment.plan.duration_days, payment.paid_amount), (15, 899))
+
+    def test_resubmitted_form_pays_once(self):
+        token = self.checkout()
+        self.pay(token)
+        response = self.pay(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['payment'].paid_amount, 899)
+        self.assertEqual(CoursePayment.objects.count(), 1)
+
+    def test_activation_writes_the_course_once(self):
+        plans.get_registry()
+        with QueryRecorder() as recorder:
+            payments.activate_listing(self.course, self.provider, 15, payments.new_token())
+        # (the featured slate refresh it queues runs inline in tests)
+        writes = [sql for sql, _ in recorder.queries
+                  if sql.startswith(('INSERT INTO "courses_coursepayment"', 'UPDATE "courses_course"'))]
+        self.assertEqual(len(writes), 2, writes)
+
+    def test_other_integrity_errors_are_not_replays(self):
+        with mock.patch.object(CoursePayment, 'save', side_effect=IntegrityError('FOREIGN KEY constraint failed')):
+            response = self.pay(self.checkout())
+        self.assertRedirects(response, f'/courses/payment/{self.course.id}/')
+        self.course.refresh_from_db()
+        self.assertFalse(self.course.is_active)
+
+    def test_unknown_plan_and_missing_token_are_rejected(self):
+        payment_page = f'/courses/payment/{self.course.id}/'
+        self.assertRedirects(self.client.post(self.url, {'plan': 12}), payment_page)
+        self.assertRedirects(self.client.post(self.url, {'plan': 15, 'process_payment': ''}), payment_page)
+        self.assertFalse(CoursePayment.objects.exists())
+
+    def test_plans_are_served_from_memory(self):
+        plans.get_registry()
+        with self.assertNumQueries(0):
+            self.assertEqual([plan.duration_days for plan in plans.get_registry()], [7, 15, 30])
+            self.assertEqual(plans.get('15').price, 899)
+            self.assertIsNone(plans.get('twelve'))
+        # session, user, course and the navbar counts; none for the plans
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/courses/payment/{self.course.id}/')
+        self.assertContains(response, '₹1499')
+
+    def test_plan_changes_reach_the_registry(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CourseListingPlan.objects.filter(duration_days=7).get().delete()
+            CourseListingPlan.objects.create(name="Fortnight", duration_days=14, price=799)
+        self.assertIsNone(plans.get(7))
+        self.assertEqual(plans.get(14).name, "Fortnight")
+        self.assertRedirects(self.client.post(self.url, {'plan': 7}), f'/courses/payment/{self.course.id}/')
+
+    def test_plans_edited_elsewhere_reload_after_max_age(self):
+        registry = plans.get_registry()
+        # Another process, with a cache of its own
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'admin',
+        }}), self.captureOnCommitCallbacks(execute=True):
+            plan = CourseListingPlan.objects.get(duration_days=7)
+            plan.price = 599
+            plan.save()
+        self.assertEqual(plans.get(7).price, 499)
+
+        registry.built_at -= plans.MAX_AGE
+        self.assertEqual(plans.get(7).price, 599)
+
+
+class FeaturedSlateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        plans.reset()
+        self.provider = User.objects.create_user(username='provider', password='password123')
+        self.plans = {plan.duration_days: plan for plan in CourseListingPlan.objects.all()}
+
+    def paid_course(self, title, days, paid_days_ago=0):
+        now = timezone.now()
+        course = Course.objects.create(
+            provider=self.provider, title=title, description="...", instructor="Someone",
+            is_active=True, expires_on=(now + timedelta(days=days - paid_days_ago)).date(),
+        )
+        payment = CoursePayment(
+            course=course, provider=self.provider, plan=self.plans[days], paid_amount=self.plans[days].price,
+            end_date=now + timedelta(days=days - paid_days_ago),
+        )
+        payment.save(update_course=False)
+        CoursePayment.objects.filter(pk=payment.pk).update(start_date=now - timedelta(days=paid_days_ago))
+        return course
+
+    def test_slate_blends_tier_remaining_time_and_recency(self):
+        premium = self.paid_course("Premium", 30)
+        standard = self.paid_course("Standard", 15)
+        old_premium = self.paid_course("Old premium", 30, paid_days_ago=25)
+        self.paid_course("Basic", 7)
+        gone = self.paid_course("Gone", 15)
+        Course.objects.filter(pk=gone.pk).update(expires_on=timezone.now().date() - timedelta(days=1))
+
+        # A fresh Standard listing outranks a Premium one about to run out
+        self.assertEqual(refresh_featured_courses(), [premium.pk, standard.pk, old_premium.pk])
+        self.assertEqual(
+            list(FeaturedCourse.objects.values_list('position', 'course_id', 'plan_name')),
+            [(0, premium.pk, "Premium"), (1, standard.pk, "Standard"), (2, old_premium.pk, "Premium")],
+        )
+
+    def test_pages_read_the_prebuilt_slate(self):
+        standard = self.paid_course("Standard", 15)
+        premium = self.paid_course("Premium", 30)
+        basic = self.paid_course("Basic", 7)
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_featured_courses()
+
+        response = self.client.get('/')
+        self.assertEqual(response.context['featured_courses'], [premium, standard])
+        with self.assertNumQueries(1):
+            self.assertEqual(featured.get_placements(), [(premium.pk, "Premium"), (standard.pk, "Standard")])
+
+        self.client.login(username='provider', password='password123')
+        response = self.client.get('/courses/')
+        self.assertEqual(list(response.context['courses']), [premium, standard, basic])
+        self.assertContains(response, 'Featured · Premium')
+
+    def test_refresh_in_another_process_reaches_the_pages(self):
+        self.assertEqual(featured.get_placements(), [])
+        premium = self.paid_course("Premium", 30)
+        # The worker, with a cache of its own
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker',
+        }}), self.captureOnCommitCallbacks(execute=True):
+            refresh_featured_courses()
+
+        self.client.login(username='provider', password='password123')
+        response = self.client.get('/courses/')
+        self.assertEqual(featured.get_placements(), [(premium.pk, "Premium")])
+        self.assertContains(response, 'Featured · Premium')
+
+    def test_buying_a_featured_plan_refreshes_the_slate(self):
+        course = Course.objects.create(provider=self.provider, title="New", description="...", instructor="Someone")
+        payments.activate_listing(course, self.provider, 15, payments.new_token())
+        self.assertEqual(list(FeaturedCourse.objects.values_list('course_id', flat=True)), [course.pk])
@@ -0,0 +1,40 @@
+"""
+Bulk maintenance of the denormalized per-status application counters on Job.
+Day-to-day updates happen incrementally (see Job.shift_counters); these
+helpers recompute them from the Application table when they may have drifted.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+STATUSES = ('pending', 'accepted', 'rejected')
+
+
+def count_subquery(application_model, status):
+    counts = (
+        application_model.objects.filter(job=OuterRef('pk'), status=status)
+        .order_by()
+        .values('job')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def rebuild_counters(jobs):
+    """Recompute counters for every job in ``jobs`` with a single UPDATE."""
+    application_model = jobs.model._meta.get_field('applications').related_model
+    return jobs.update(**{
+        f"{status}_count": count_subquery(application_model, status)
+        for status in STATUSES
+    })
+
+
+def drifted_jobs(jobs):
+    """Jobs whose stored counters disagree with the Application table."""
+    annotated = jobs.annotate(**{
+        f"actual_{status}": Count('applications', filter=Q(applications__status=status))
+        for status in STATUSES
+    })
+    return annotated.exclude(**{
+        f"{status}_count": F(f"actual_{status}") for status in STATUSES
+    })
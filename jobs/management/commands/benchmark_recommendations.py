@@ -0,0 +1,66 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import ranking, recommend
+from jobs.management.commands.benchmark_search import (
+    ROLES, SENIORITY, STACKS, summarize, synthetic_jobs, synthetic_vocabulary,
+)
+
+TOOLS = ['git', 'docker', 'sql', 'aws', 'figma', 'linux', 'excel', 'kubernetes']
+
+
+def synthetic_profiles(rng, count):
+    for _ in range(count):
+        skills = rng.sample(STACKS, rng.randint(1, 4)) + rng.sample(TOOLS, rng.randint(0, 3))
+        yield {
+            'skills': ', '.join(skills),
+            'bio': f"{rng.choice(SENIORITY)} {rng.choice(ROLES)}",
+        }
+
+
+class Command(BaseCommand):
+    help = 'Measures job recommendation and applicant ranking latency against an in-memory job index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--seekers', type=int, default=10_000)
+        parser.add_argument('--applied', type=int, default=10,
+                            help='Jobs each synthetic seeker has already applied for.')
+        parser.add_argument('--applicants', type=int, default=5_000,
+                            help='Size of the applicant pool ranked against each sampled job.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = synthetic_vocabulary(rng)
+        # Generated up front so the build time is the index alone; ids
+        # descend like the newest-first rows the real index is built from
+        jobs = [{'id': options['jobs'] - position, **job}
+                for position, job in enumerate(synthetic_jobs(rng, options['jobs'], vocabulary))]
+
+        started = time.perf_counter()
+        index = recommend.JobTermIndex.build(jobs)
+        build = time.perf_counter() - started
+        self.stdout.write(f"[build] jobs={len(index):>9,} terms={len(index.columns):,} {build:.1f}s")
+
+        profiles = list(synthetic_profiles(rng, options['seekers']))
+        samples = []
+        for profile in profiles:
+            applied = {rng.randint(1, options['jobs']) for _ in range(options['applied'])}
+            started = time.perf_counter()
+            query = index.vectorize(recommend.term_weights(profile, recommend.PROFILE_FIELD_WEIGHTS))
+            index.top(query, recommend.RECOMMENDATION_COUNT, exclude_ids=applied)
+            samples.append(time.perf_counter() - started)
+
+        self.stdout.write(f"[recommend] seekers={options['seekers']:>6,} {summarize(samples)}")
+
+        pool = [rng.choice(profiles) for _ in range(options['applicants'])]
+        samples = []
+        for job in rng.sample(jobs, min(50, len(jobs))):
+            started = time.perf_counter()
+            ranking.score_profiles(ranking.vectorize_job(job, index), pool, index)
+            samples.append(time.perf_counter() - started)
+
+        self.stdout.write(f"[rank] applicants={len(pool):>6,} {summarize(samples)}")
@@ -0,0 +1,145 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import User
+from jobs import search
+from jobs.models import Job
+
+SENIORITY = ['junior', 'senior', 'lead', 'principal', 'intern', 'staff']
+ROLES = ['developer', 'engineer', 'designer', 'analyst', 'manager', 'architect', 'tester', 'consultant']
+STACKS = ['python', 'django', 'react', 'java', 'golang', 'kotlin', 'devops', 'data', 'cloud', 'mobile']
+LOCATIONS = ['Remote', 'Kerala', 'Bangalore', 'Chennai', 'Mumbai', 'Pune', 'Hyderabad', 'Delhi']
+
+
+def synthetic_vocabulary(rng, size=5000):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+def synthetic_jobs(rng, count, vocabulary):
+    # Zipf-like weights so a few description words are common and most are rare
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for _ in range(count):
+        yield {
+            'title': f"{rng.choice(SENIORITY)} {rng.choice(STACKS)} {rng.choice(ROLES)}",
+            'location': rng.choice(LOCATIONS),
+            'description': ' '.join(rng.choices(vocabulary + STACKS, weights + [50] * len(STACKS), k=40)),
+        }
+
+
+def synthetic_queries(rng, count):
+    queries = []
+    for _ in range(count):
+        terms = [rng.choice(STACKS), rng.choice(ROLES), rng.choice(SENIORITY)]
+        terms = rng.sample(terms, rng.randint(1, 2))
+        # Truncate the last term to exercise prefix matching
+        terms[-1] = terms[-1][:max(3, len(terms[-1]) - 2)]
+        queries.append(' '.join(terms))
+    return queries
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50={pick(0.50):.2f}ms p95={pick(0.95):.2f}ms p99={pick(0.99):.2f}ms mean={statistics.mean(samples) * 1000:.2f}ms"
+
+
+class Command(BaseCommand):
+    help = 'Measures job search latency at increasing job counts (10k, 100k, 1M by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--backend',
+            choices=['index', 'database'],
+            default='index',
+            help="'index' benchmarks the in-process inverted index only; "
+                 "'database' inserts synthetic jobs (rolled back afterwards) and times "
+                 "search_jobs() against the legacy icontains filter.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = synthetic_vocabulary(rng)
+        queries = synthetic_queries(rng, options['queries'])
+        sizes = sorted(options['sizes'])
+
+        if options['backend'] == 'index':
+            self.bench_index(rng, sizes, vocabulary, queries)
+        else:
+            self.bench_database(rng, sizes, vocabulary, queries)
+
+    def bench_index(self, rng, sizes, vocabulary, queries):
+        index = search.InvertedIndex()
+        docs = synthetic_jobs(rng, sizes[-1], vocabulary)
+        loaded = 0
+        for size in sizes:
+            started = time.perf_counter()
+            while loaded < size:
+                loaded += 1
+                index.add(loaded, **next(docs))
+            build = time.perf_counter() - started
+
+            samples = []
+            for query in queries:
+                started = time.perf_counter()
+                index.search(query)
+                samples.append(time.perf_counter() - started)
+
+            self.stdout.write(f"[index] jobs={size:>9,} build(+{build:.1f}s) {summarize(samples)}")
+
+    def bench_database(self, rng, sizes, vocabulary, queries):
+        backend = 'postgres tsvector' if search.uses_postgres() else 'inverted index'
+
+        with transaction.atomic():
+            recruiter = User.objects.create(username='search-benchmark', user_type='recruiter')
+            docs = synthetic_jobs(rng, sizes[-1], vocabulary)
+            loaded = Job.objects.count()
+
+            for size in sizes:
+                started = time.perf_counter()
+                batch = []
+                while loaded < size:
+                    loaded += 1
+                    batch.append(Job(recruiter=recruiter, **next(docs)))
+                    if len(batch) == 5000:
+                        Job.objects.bulk_create(batch)
+                        batch = []
+                if batch:
+                    Job.objects.bulk_create(batch)
+                # bulk_create skips signals, so bring the search structures up to date by hand
+                if search.uses_postgres():
+                    Job.objects.filter(search_vector__isnull=True).update(search_vector=search.job_search_vector())
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE jobs_job')
+                else:
+                    search.reset_index()
+                    search.ensure_index()
+                load = time.perf_counter() - started
+
+                ranked, legacy = [], []
+                for query in queries:
+                    started = time.perf_counter()
+                    list(search.search_jobs(Job.objects.all(), query)[:20])
+                    ranked.append(time.perf_counter() - started)
+
+                    started = time.perf_counter()
+                    list(Job.objects.filter(
+                        Q(title__icontains=query) | Q(description__icontains=query)
+                    ).order_by('-posted_on')[:20])
+                    legacy.append(time.perf_counter() - started)
+
+                self.stdout.write(f"[{backend}] jobs={size:>9,} load(+{load:.1f}s) {summarize(ranked)}")
+                self.stdout.write(f"[icontains] jobs={size:>9,} {summarize(legacy)}")
+
+            transaction.set_rollback(True)
+
+        search.reset_index()
+        self.stdout.write(self.style.SUCCESS('Benchmark finished, synthetic jobs rolled back.'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:33
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The GIN index and the backfill only make sense on PostgreSQL; other
+# backends use the in-process index in jobs/search.py instead.
+def add_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "UPDATE jobs_job SET search_vector = "
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+    )
+    schema_editor.execute(
+        "CREATE INDEX jobs_job_search_vector_gin ON jobs_job USING gin (search_vector)"
+    )
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS jobs_job_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_alter_savedjob_job_alter_savedjob_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:38
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('jobs', 'Application')
+    db = schema_editor.connection.alias
+
+    def count(status):
+        counts = (
+            Application.objects.using(db).filter(job=OuterRef('pk'), status=status)
+            .order_by().values('job').annotate(total=Count('id')).values('total')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    Job.objects.using(db).update(
+        pending_count=count('pending'),
+        accepted_count=count('accepted'),
+        rejected_count=count('rejected'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='accepted_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
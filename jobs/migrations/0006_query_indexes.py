@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_application_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-applied_on', '-id'], name='application_job_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applicant', '-applied_on', '-id'], name='application_applicant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-posted_on', '-id'], name='job_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['recruiter', '-posted_on', '-id'], name='job_recruiter_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedjob',
+            index=models.Index(fields=['user', '-saved_on', '-id'], name='savedjob_user_saved_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:33
+
+import skillbridge.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=skillbridge.uploads.resume_storage, upload_to='applications/'),
+        ),
+    ]
@@ -1,5 +1,46 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.contrib.postgres.search import SearchVectorField
 from accounts.models import User
+from skillbridge.uploads import resume_storage
+
+
+# ----------------------------------------------------
+# QUERYSETS
+# Each method returns exactly what one kind of page renders, joins
+# included, so views don't follow foreign keys lazily per row.
+# ----------------------------------------------------
+class JobQuerySet(models.QuerySet):
+    def for_listing(self):
+        # Job cards show no related objects; the search vector is only
+        # ever filtered on, never read back
+        return self.defer('search_vector')
+
+    def for_recruiter(self, user):
+        return self.filter(recruiter=user).for_listing()
+
+    def for_detail(self):
+        return self.select_related('recruiter')
+
+
+class ApplicationQuerySet(models.QuerySet):
+    def for_applicant_listing(self, user):
+        return self.filter(applicant=user).select_related('job__recruiter', 'applicant')
+
+    def for_recruiter_listing(self, user):
+        return self.filter(job__recruiter=user).select_related('job', 'applicant')
+
+    def for_job_listing(self, job):
+        return self.filter(job=job).select_related('applicant').order_by('-applied_on', '-id')
+
+    def for_detail(self):
+        return self.select_related('job__recruiter', 'applicant')
+
+
+class SavedJobQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(user=user).select_related('job')
 
 
 class Job(models.Model):
@@ -16,6 +57,46 @@ class Job(models.Model):
     posted_on = models.DateTimeField(auto_now_add=True)
     deadline = models.DateField(null=True, blank=True)
 
+    # Maintained by jobs.signals on PostgreSQL, see jobs/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Denormalized application counts per status, kept current by
+    # jobs.signals / Application.set_status and rebuilt by the
+    # rebuild_application_counters command.
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    accepted_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Job list / homepage, and the keyset pagination tiebreaker
+            models.Index(fields=['-posted_on', '-id'], name='job_posted_idx'),
+            # my_jobs / recruiter_jobs
+            models.Index(fields=['recruiter', '-posted_on', '-id'], name='job_recruiter_posted_idx'),
+        ]
+
+    @property
+    def applications_count(self):
+        return self.pending_count + self.accepted_count + self.rejected_count
+
+    @staticmethod
+    def counter_field(status):
+        return f"{status}_count"
+
+    @classmethod
+    def shift_counters(cls, job_id, **deltas):
+        """
+        Apply status -> delta changes to a job's counters in one UPDATE,
+        e.g. shift_counters(job.id, pending=-1, accepted=1).
+        """
+        changes = {}
+        for status, delta in deltas.items():
+            field = cls.counter_field(status)
+            changes[field] = Greatest(F(field) + delta, 0)
+        cls.objects.filter(pk=job_id).update(**changes)
+
     def __str__(self):
         return f"{self.title} ({self.recruiter.username})"
 
@@ -32,7 +113,8 @@ class Application(models.Model):
         limit_choices_to={'user_type': 'job_seeker'},
         related_name='applications'
     )
-    resume = models.FileField(upload_to='applications/', blank=True, null=True)
+    # Shares the profile resumes' storage, so identical files are stored once
+    resume = models.FileField(upload_to='applications/', storage=resume_storage, blank=True, null=True)
     applied_on = models.DateTimeField(auto_now_add=True)
     status = models.CharField(
         max_length=20,
@@ -44,6 +126,37 @@ class Application(models.Model):
         default='pending'
     )
 
+    objects = ApplicationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Applicants of a job, newest first
+            models.Index(fields=['job', '-applied_on', '-id'], name='application_job_applied_idx'),
+            # my_applications
+            models.Index(fields=['applicant', '-applied_on', '-id'], name='application_applicant_idx'),
+        ]
+
+    def set_status(self, status, expected=None):
+        """
+        Move the application to ``status`` and shift the job's counters in
+        the same transaction. The row is locked first so two recruiters
+        acting at once can't double count. Returns False (and changes
+        nothing) if the status is already ``status`` or isn't ``expected``.
+        """
+        with transaction.atomic():
+            current = (
+                Application.objects.select_for_update()
+                .values_list('status', flat=True)
+                .get(pk=self.pk)
+            )
+            if current == status or (expected is not None and current != expected):
+                self.status = current
+                return False
+            self.status = status
+            self.save(update_fields=['status'])
+            Job.shift_counters(self.job_id, **{current: -1, status: 1})
+        return True
+
     def __str__(self):
         return f"{self.applicant.username} → {self.job.title}"
 
@@ -53,8 +166,13 @@ class SavedJob(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     saved_on = models.DateTimeField(auto_now_add=True)
 
+    objects = SavedJobQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'job')
+        indexes = [
+            models.Index(fields=['user', '-saved_on', '-id'], name='savedjob_user_saved_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} saved {self.job.title}"
@@ -0,0 +1,126 @@
+"""
+Ranking a job's applicants by how well their profile matches the job.
+
+Both sides are TF-IDF vectors over the same terms as the recommendation
+index (jobs/recommend.py), and the score is their cosine similarity:
+
+* the job's vector comes from its title and description, weighted by the
+  index's IDF. It is cached per job, tagged with the index build, and
+  dropped when the job is edited. The page never builds the index itself:
+  until this process has one (it is built in the background), every term
+  is weighted as if equally rare and the vector isn't cached.
+* ``score_profiles`` scores a whole applicant pool in one pass. The terms
+  the profiles share with the job are laid out as flat row/weight arrays
+  and summed per applicant with one ``np.bincount``, so the per-applicant
+  Python work is just tokenizing their skills and bio.
+"""
+import math
+
+import numpy as np
+from django.core.cache import cache
+
+from . import recommend
+
+JOB_VECTOR_KEY = "ranking:job:%s"
+JOB_VECTOR_TTL = recommend.RESULT_TTL
+
+SORT_NEWEST = "newest"
+SORT_MATCH = "match"
+SORT_CHOICES = (SORT_NEWEST, SORT_MATCH)
+
+
+# Stands in for the index until this process has built one
+NO_INDEX = recommend.JobTermIndex.build([])
+
+
+def current_index():
+    return recommend.get_index(wait=False) or NO_INDEX
+
+
+def _idf(index, term):
+    # Terms no indexed job uses (a job newer than the index, or a skill
+    # nobody asks for) count as if they appeared in a single job
+    return index.idf.get(term) or math.log(1 + (len(index) or 1))
+
+
+def _normalized(weights):
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {term: weight / norm for term, weight in weights.items()}
+
+
+def job_vector(job):
+    """The job's normalized {term: weight} vector."""
+    index = current_index()
+    cached = cache.get(JOB_VECTOR_KEY % job.pk)
+    if cached is not None and cached[0] == index.build_id:
+        return cached[1]
+
+    fields = {field: getattr(job, field) for field in recommend.JOB_FIELD_WEIGHTS}
+    vector = vectorize_job(fields, index)
+    if index is not NO_INDEX:
+        cache.set(JOB_VECTOR_KEY % job.pk, (index.build_id, vector), timeout=JOB_VECTOR_TTL)
+    return vector
+
+
+def vectorize_job(fields, index):
+    weights = recommend.term_weights(fields, recommend.JOB_FIELD_WEIGHTS)
+    return _normalized({term: tf * _idf(index, term) for term, tf in weights.items()})
+
+
+def forget_job(job_id):
+    cache.delete(JOB_VECTOR_KEY % job_id)
+
+
+def score_profiles(vector, profiles, index=None):
+    """
+    Cosine similarity of each profile (dicts with skills and bio) with a
+    job ``vector``, as a float array in the order given, 0 for no overlap.
+    """
+    index = index or current_index()
+    columns = {term: column for column, term in enumerate(vector)}
+    job_weights = np.fromiter(vector.values(), dtype=np.float64, count=len(vector))
+
+    rows, cols, weights = [], [], []
+    norms = np.ones(len(profiles), dtype=np.float64)
+    for row, profile in enumerate(profiles):
+        terms = recommend.term_weights(profile, recommend.PROFILE_FIELD_WEIGHTS)
+        squares = 0.0
+        for term, tf in terms.items():
+            weight = tf * _idf(index, term)
+            squares += weight * weight
+            column = columns.get(term)
+            if column is not None:
+                rows.append(row)
+                cols.append(column)
+                weights.append(weight)
+        if squares:
+            norms[row] = math.sqrt(squares)
+
+    if not rows:
+        return np.zeros(len(profiles), dtype=np.float64)
+    products = np.asarray(weights) * job_weights[np.asarray(cols)]
+    return np.bincount(np.asarray(rows), weights=products, minlength=len(profiles)) / norms
+
+
+def rank_applications(job, applications):
+    """
+    ``applications`` (for ``job``) as a list, best match first and newest
+    first among equals, each with ``match`` set to a 0-100 percentage.
+    """
+    from accounts.models import JobSeekerProfile
+
+    applications = list(applications)
+    profiles = {
+        profile["user_id"]: profile
+        for profile in JobSeekerProfile.objects.filter(user__applications__job=job)
+                                               .values("user_id", *recommend.PROFILE_FIELD_WEIGHTS)
+    }
+    scores = score_profiles(
+        job_vector(job),
+        [profiles.get(application.applicant_id, {}) for application in applications],
+    )
+    for application, score in zip(applications, scores.tolist()):
+        application.match = round(score * 100)
+    # A stable argsort keeps the incoming newest-first order among equals
+    order = np.argsort(-scores, kind="stable")
+    return [applications[position] for position in order.tolist()]
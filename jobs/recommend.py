@@ -0,0 +1,267 @@
+"""
+Skill-based job recommendations for the job seeker dashboard.
+
+Every job is turned into a TF-IDF vector over the words of its title and
+description, and the vectors are kept column-wise in a ``JobTermIndex``:
+for each term, the positions of the jobs that contain it and their weights.
+A seeker's skills (and, less strongly, bio) become a query vector over the
+same terms, so scoring every job is a sparse dot product, which is one
+``np.bincount`` over the columns of the handful of terms the seeker has.
+No per-job Python loop, and no anti-join against Application.
+
+The index is built per process on first use, from jobs in recency order so
+ties and the no-skills fallback favour the newest jobs. Job saves and
+deletes bump a version in the cache; once a process's index is out of date
+and at least ``RECOMMENDATION_INDEX_MAX_AGE`` seconds old, a background
+thread rebuilds it while requests keep using the old one, so a burst of
+new jobs costs one rebuild and no request waits for it. The version only
+reaches other processes through a shared cache, so an index is also
+rebuilt once it is ``RECOMMENDATION_INDEX_REFRESH`` seconds old whatever
+the version says. Only a process's very first lookup builds the index in
+the caller. Each seeker's result is cached against the index build it came
+from and dropped when their profile changes or they apply for a job.
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .search import tokenize
+
+# How much each job field counts towards its vector
+JOB_FIELD_WEIGHTS = {
+    "title": 2.0,
+    "description": 1.0,
+}
+# And each profile field towards the seeker's query
+PROFILE_FIELD_WEIGHTS = {
+    "skills": 1.0,
+    "bio": 0.3,
+}
+MIN_TERM_LENGTH = 2
+
+RECOMMENDATION_COUNT = 4
+INDEX_MAX_AGE = getattr(settings, "RECOMMENDATION_INDEX_MAX_AGE", 5 * 60)
+INDEX_REFRESH = getattr(settings, "RECOMMENDATION_INDEX_REFRESH", 30 * 60)
+RESULT_TTL = getattr(settings, "RECOMMENDATION_CACHE_TTL", 60 * 60)
+
+logger = logging.getLogger("skillbridge.recommend")
+
+VERSION_KEY = "recommend:jobs-version"
+SEEKER_KEY = "recommend:seeker:%s"
+
+
+def term_weights(fields, field_weights):
+    """{term: weight} for a dict of texts, with sublinear (log) term frequency."""
+    counts = Counter()
+    for field, weight in field_weights.items():
+        for token in tokenize(fields.get(field)):
+            if len(token) >= MIN_TERM_LENGTH:
+                counts[token] += weight
+    return {term: math.log1p(count) for term, count in counts.items()}
+
+
+class JobTermIndex:
+    def __init__(self, job_ids, columns, idf, version=None):
+        self.job_ids = job_ids            # position -> job id, newest first
+        self.columns = columns            # term -> (positions int32[], weights float32[])
+        self.idf = idf                    # term -> inverse document frequency
+        self.version = version
+        self.built_at = time.monotonic()
+        # Tags results derived from this build; unique across processes
+        self.build_id = uuid.uuid4().hex
+        self.positions = {job_id: position for position, job_id in enumerate(job_ids.tolist())}
+
+    @classmethod
+    def build(cls, jobs, version=None):
+        """``jobs``: iterable of dicts with id, title and description, newest first."""
+        job_ids, documents = [], []
+        document_frequency = Counter()
+        for job in jobs:
+            weights = term_weights(job, JOB_FIELD_WEIGHTS)
+            job_ids.append(job["id"])
+            documents.append(weights)
+            document_frequency.update(weights.keys())
+
+        total = len(documents) or 1
+        idf = {term: math.log(1 + total / df) for term, df in document_frequency.items()}
+
+        positions, weights = defaultdict(list), defaultdict(list)
+        for position, document in enumerate(documents):
+            norm = math.sqrt(sum((tf * idf[term]) ** 2 for term, tf in document.items())) or 1.0
+            for term, tf in document.items():
+                positions[term].append(position)
+                weights[term].append(tf * idf[term] / norm)
+
+        columns = {
+            term: (np.array(positions[term], dtype=np.int32), np.array(weights[term], dtype=np.float32))
+            for term in positions
+        }
+        return cls(np.array(job_ids, dtype=np.int64), columns, idf, version)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def vectorize(self, weights):
+        """Weight a {term: tf} query by IDF, dropping terms no job uses."""
+        return {term: tf * self.idf[term] for term, tf in weights.items() if term in self.columns}
+
+    def scores(self, query):
+        """Dot product of ``query`` with every job vector, as an array indexed by position."""
+        if not query:
+            return np.zeros(len(self), dtype=np.float64)
+        terms = list(query)
+        positions = np.concatenate([self.columns[term][0] for term in terms])
+        weights = np.concatenate([self.columns[term][1] * query[term] for term in terms])
+        return np.bincount(positions, weights=weights, minlength=len(self))
+
+    def top(self, query, limit, exclude_ids=()):
+        """
+        Ids of the ``limit`` best matching jobs, best first. Jobs that
+        share no term with the query are not matches; if there are fewer
+        than ``limit`` matches, the newest remaining jobs fill the list.
+        """
+        scores = self.scores(query)
+        excluded = [self.positions[job_id] for job_id in exclude_ids if job_id in self.positions]
+        scores[excluded] = -1.0
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        # Best score first, newest (lowest position) on ties
+        ranked = matched[np.lexsort((matched, -scores[matched]))].tolist()
+
+        if len(ranked) < limit:
+            chosen = set(ranked)
+            for position in np.flatnonzero(scores == 0).tolist():
+                if position not in chosen:
+                    ranked.append(position)
+                    if len(ranked) == limit:
+                        break
+        return self.job_ids[ranked].tolist()
+
+
+# ----------------------------------------------------
+# PER-PROCESS INDEX
+# ----------------------------------------------------
+_index = None
+_lock = threading.Lock()
+_rebuilding = threading.Lock()
+
+
+def jobs_version():
+    return cache.get_or_set(VERSION_KEY, 0, timeout=None)
+
+
+def jobs_changed():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def build_index(version=None):
+    from .models import Job
+
+    jobs = Job.objects.order_by("-posted_on", "-id").values("id", *JOB_FIELD_WEIGHTS).iterator(chunk_size=5000)
+    return JobTermIndex.build(jobs, version)
+
+
+def get_index(wait=True):
+    """
+    This process's index, possibly a little out of date. The first call
+    builds it, or with ``wait=False`` returns None and leaves the build to
+    a background thread.
+    """
+    global _index
+    version = jobs_version()
+    current = _index
+    if current is not None:
+        age = time.monotonic() - current.built_at
+        if age < INDEX_MAX_AGE or (current.version == version and age < INDEX_REFRESH):
+            return current
+
+    if current is None and wait:
+        with _lock:
+            if _index is None:
+                _index = build_index(version)
+            return _index
+
+    _start_rebuild(current, version)
+    return _index
+
+
+def _start_rebuild(current, version):
+    # With TASKS_EAGER (the tests) background work runs inline
+    if getattr(settings, "TASKS_EAGER", False):
+        _rebuild(current, version)
+    elif _rebuilding.acquire(blocking=False):
+        threading.Thread(target=_rebuild_in_background, args=(current, version), daemon=True).start()
+
+
+def _rebuild(current, version):
+    global _index
+    index = build_index(version)
+    with _lock:
+        # reset_index() may have run meanwhile
+        if _index is current:
+            _index = index
+
+
+def _rebuild_in_background(current, version):
+    try:
+        _rebuild(current, version)
+    except Exception:
+        logger.exception("Rebuilding the recommendation index failed")
+    finally:
+        connections.close_all()
+        _rebuilding.release()
+
+
+def reset_index():
+    global _index
+    with _lock:
+        _index = None
+
+
+# ----------------------------------------------------
+# PUBLIC API
+# ----------------------------------------------------
+def recommended_job_ids(user, limit=RECOMMENDATION_COUNT):
+    index = get_index()
+    cached = cache.get(SEEKER_KEY % user.pk)
+    if cached is not None:
+        build_id, cached_limit, job_ids = cached
+        if build_id == index.build_id and cached_limit >= limit:
+            return job_ids[:limit]
+
+    from accounts.models import JobSeekerProfile
+    from .models import Application
+
+    profile = JobSeekerProfile.objects.filter(user=user).values(*PROFILE_FIELD_WEIGHTS).first() or {}
+    applied = Application.objects.filter(applicant=user).values_list("job_id", flat=True)
+    query = index.vectorize(term_weights(profile, PROFILE_FIELD_WEIGHTS))
+
+    job_ids = index.top(query, limit, exclude_ids=set(applied))
+    cache.set(SEEKER_KEY % user.pk, (index.build_id, limit, job_ids), timeout=RESULT_TTL)
+    return job_ids
+
+
+def recommended_jobs(user, limit=RECOMMENDATION_COUNT):
+    from .models import Job
+
+    job_ids = recommended_job_ids(user, limit)
+    jobs = Job.objects.for_listing().in_bulk(job_ids)
+    # Jobs deleted since the index was built simply drop out
+    return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+
+def forget(user_id):
+    cache.delete(SEEKER_KEY % user_id)
@@ -0,0 +1,35 @@
+"""
+Plain-dict representations of jobs and applications for the JSON
+(infinite scroll) variants of the list views.
+"""
+from django.urls import reverse
+
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'location': job.location,
+        'salary': str(job.salary) if job.salary is not None else None,
+        'posted_on': job.posted_on.isoformat(),
+        'deadline': job.deadline.isoformat() if job.deadline else None,
+        'url': reverse('job_detail', args=[job.id]),
+    }
+
+
+def serialize_saved_job(saved):
+    return {
+        'id': saved.id,
+        'saved_on': saved.saved_on.isoformat(),
+        'job': serialize_job(saved.job),
+    }
+
+
+def serialize_application(application):
+    return {
+        'id': application.id,
+        'status': application.status,
+        'applied_on': application.applied_on.isoformat(),
+        'applicant': application.applicant.username,
+        'job': serialize_job(application.job),
+    }
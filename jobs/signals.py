@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import JobSeekerProfile
+from .models import Job, Application
+from . import ranking, recommend, search
+
+
+@receiver(post_save, sender=Job)
+def update_job_search_index(sender, instance, using, update_fields=None, **kwargs):
+    # Saves that don't touch searchable text (e.g. counters) can skip the refresh
+    if update_fields is not None and not set(update_fields) & set(search.FIELD_WEIGHTS):
+        return
+
+    if search.uses_postgres(using):
+        search.refresh_search_vector([instance.pk])
+    elif search.index.ready:
+        fields = {field: getattr(instance, field) for field in search.FIELD_WEIGHTS}
+        transaction.on_commit(lambda: search.index.add(instance.pk, **fields), using=using)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_search_index(sender, instance, using, **kwargs):
+    if not search.uses_postgres(using) and search.index.ready:
+        job_id = instance.pk
+        transaction.on_commit(lambda: search.index.remove(job_id), using=using)
+
+
+# ----------------------------------------------------
+# APPLICATION COUNTERS
+# ----------------------------------------------------
+# Status changes go through Application.set_status.
+@receiver(post_save, sender=Application)
+def count_new_application(sender, instance, created, **kwargs):
+    if created:
+        Job.shift_counters(instance.job_id, **{instance.status: 1})
+
+
+@receiver(post_delete, sender=Application)
+def count_deleted_application(sender, instance, origin=None, **kwargs):
+    # Deleting a job takes its counters with it
+    if isinstance(origin, Job) or getattr(origin, 'model', None) is Job:
+        return
+    Job.shift_counters(instance.job_id, **{instance.status: -1})
+
+
+# ----------------------------------------------------
+# RECOMMENDATIONS
+# ----------------------------------------------------
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def job_listing_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(recommend.JOB_FIELD_WEIGHTS):
+        return
+    ranking.forget_job(instance.pk)
+    transaction.on_commit(recommend.jobs_changed)
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+def seeker_profile_changed(sender, instance, **kwargs):
+    recommend.forget(instance.user_id)
+
+
+@receiver(post_save, sender=Application)
+def forget_applied_recommendations(sender, instance, created, **kwargs):
+    # The job just applied for must drop out of the seeker's list
+    if created:
+        recommend.forget(instance.applicant_id)
@@ -1,3 +1,439 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .models import Job, Application
+from . import ranking, recommend, search
+from accounts.models import JobSeekerProfile
+from skillbridge import uploads
+from skillbridge.pagination import CursorPaginator
+from skillbridge.testing import QueryBudgetMixin, QueryPlanMixin
 
-# Create your tests here.
+User = get_user_model()
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        search.reset_index()
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.seeker = User.objects.create_user(username='seeker', password='password123')
+        self.client = Client()
+        self.client.login(username='seeker', password='password123')
+
+    def tearDown(self):
+        search.reset_index()
+
+    def make_job(self, title, description, location='Remote'):
+        return Job.objects.create(recruiter=self.recruiter, title=title, description=description, location=location)
+
+    def test_title_match_ranks_above_description_match(self):
+        in_description = self.make_job("Backend Engineer", "We use python every day")
+        in_title = self.make_job("Python Developer", "Build web services")
+
+        results = list(search.search_jobs(Job.objects.all(), "python"))
+        self.assertEqual(results, [in_title, in_description])
+
+    def test_prefix_matching_requires_every_term(self):
+        match = self.make_job("Senior Django Developer", "Kerala office")
+        self.make_job("Senior Designer", "Figma and illustration")
+
+        results = list(search.search_jobs(Job.objects.all(), "sen djan"))
+        self.assertEqual(results, [match])
+
+    def test_index_follows_edits_and_deletes(self):
+        job = self.make_job("Data Analyst", "SQL reports")
+        search.ensure_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = "Golang Engineer"
+            job.save()
+        self.assertFalse(search.search_jobs(Job.objects.all(), "analyst").exists())
+        self.assertEqual(list(search.search_jobs(Job.objects.all(), "golang")), [job])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        self.assertEqual(search.index.search("golang"), [])
+
+    def test_search_results_paginate_by_rank(self):
+        for i in range(5):
+            self.make_job(f"Python Developer {i}", "python " * i)
+        paginator = CursorPaginator(search.search_jobs(Job.objects.all(), "python"), ("-search_rank", "-posted_on", "-id"), per_page=2)
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        ranked = list(search.search_jobs(Job.objects.all(), "python"))
+        self.assertEqual(list(first) + list(second) + list(third), ranked)
+        self.assertFalse(third.has_next)
+
+    def test_job_list_search(self):
+        self.make_job("React Developer", "Frontend work")
+        self.make_job("Java Engineer", "Spring services")
+
+        response = self.client.get('/jobs/', {'search': 'reac'})
+        self.assertContains(response, "React Developer")
+        self.assertNotContains(response, "Java Engineer")
+
+
+class JobListPaginationTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        User.objects.create_user(username='seeker', password='password123')
+        self.client = Client()
+        self.client.login(username='seeker', password='password123')
+        jobs = [Job(recruiter=self.recruiter, title=f"Job {i}", description="...", location="Remote") for i in range(45)]
+        Job.objects.bulk_create(jobs)
+        # Force ties on posted_on so the id tiebreaker is exercised
+        Job.objects.filter(id__lte=Job.objects.order_by('id')[10].id).update(posted_on=Job.objects.first().posted_on)
+
+    def fetch(self, cursor=None):
+        params = {'format': 'json'}
+        if cursor:
+            params['cursor'] = cursor
+        return self.client.get('/jobs/', params).json()
+
+    def test_cursor_walks_every_job_once(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            data = self.fetch(cursor)
+            pages += 1
+            seen += [job['id'] for job in data['results']]
+            cursor = data['next']
+            if not cursor:
+                break
+
+        expected = list(Job.objects.order_by('-posted_on', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_cursor_returns_prior_page(self):
+        first = self.fetch()
+        second = self.fetch(first['next'])
+        self.assertIsNone(first['previous'])
+
+        back = self.fetch(second['previous'])
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        self.assertEqual(self.fetch('not-a-cursor')['results'], self.fetch()['results'])
+
+    def test_html_renders_page_links(self):
+        response = self.client.get('/jobs/')
+        self.assertEqual(len(response.context['jobs']), 20)
+        self.assertContains(response, 'cursor=')
+
+
+class ApplicationCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.seeker = User.objects.create_user(username='seeker', password='password123')
+        self.job = Job.objects.create(recruiter=self.recruiter, title="Tester", description="QA", location="Remote")
+        self.client = Client()
+
+    def test_apply_accept_and_reject_shift_counters(self):
+        self.client.login(username='seeker', password='password123')
+        self.client.post(f'/jobs/apply/{self.job.id}/')
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.pending_count, self.job.applications_count), (1, 1))
+
+        application = Application.objects.get()
+        self.client.login(username='recruiter', password='password123')
+        self.client.get(f'/jobs/applications/accept/{application.id}/')
+        self.client.get(f'/jobs/applications/reject/{application.id}/')
+
+        self.job.refresh_from_db()
+        application.refresh_from_db()
+        self.assertEqual(application.status, 'accepted')
+        self.assertEqual((self.job.pending_count, self.job.accepted_count, self.job.rejected_count), (0, 1, 0))
+
+    def test_recruiter_jobs_does_not_count_per_row(self):
+        for i in range(5):
+            Job.objects.create(recruiter=self.recruiter, title=f"Job {i}", description="...", location="Remote")
+        self.client.login(username='recruiter', password='password123')
+        with self.assertNumQueries(3):  # session, user, one page of jobs (no badge on this page, so no unread count)
+            self.client.get('/jobs/recruiter/jobs/')
+
+    def test_deleting_applicant_recounts_jobs(self):
+        Application.objects.create(job=self.job, applicant=self.seeker)
+        self.seeker.delete()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.pending_count, 0)
+
+    def test_deleting_an_application_shifts_counters(self):
+        other = User.objects.create_user(username='other', password='password123')
+        Application.objects.create(job=self.job, applicant=self.seeker)
+        accepted = Application.objects.create(job=self.job, applicant=other)
+        accepted.set_status('accepted')
+
+        accepted.delete()
+        Application.objects.filter(applicant=self.seeker).delete()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.pending_count, self.job.accepted_count), (0, 0))
+
+    def test_rebuild_command_detects_and_fixes_drift(self):
+        Application.objects.create(job=self.job, applicant=self.seeker)
+        Job.objects.filter(pk=self.job.pk).update(pending_count=7, rejected_count=2)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_application_counters', '--check', stdout=StringIO())
+
+        call_command('rebuild_application_counters', stdout=StringIO())
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.pending_count, self.job.rejected_count), (1, 0))
+        call_command('rebuild_application_counters', '--check', stdout=StringIO())
+
+
+class QueryPlanTests(QueryPlanMixin, QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.seeker = User.objects.create_user(username='seeker', password='password123')
+        self.job = Job.objects.create(recruiter=self.recruiter, title="Indexed", description="...", location="Remote")
+        Application.objects.create(job=self.job, applicant=self.seeker)
+
+    def test_job_list(self):
+        self.client.login(username='seeker', password='password123')
+        self.assertIndexedQueries('/jobs/', ['jobs_job'])
+
+    def test_recruiter_listings(self):
+        self.client.login(username='recruiter', password='password123')
+        self.assertIndexedQueries('/jobs/recruiter/jobs/', ['jobs_job'])
+        self.assertIndexedQueries(f'/jobs/job/{self.job.id}/applicants/', ['jobs_application'])
+
+    def test_job_list_query_budget(self):
+        for i in range(5):
+            Job.objects.create(recruiter=self.recruiter, title=f"Job {i}", description="...", location="Remote")
+        self.client.login(username='seeker', password='password123')
+        self.assertQueryBudget('/jobs/')
+
+    def test_recruiter_detail_pages_query_budget(self):
+        application = Application.objects.get()
+        self.client.login(username='recruiter', password='password123')
+        self.assertQueryBudget(f'/jobs/application/{application.id}/', 5)
+        self.assertQueryBudget(f'/jobs/job/{self.job.id}/applications/', 6)
+        self.assertQueryBudget(f'/jobs/{self.job.id}/', 6)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        recommend.reset_index()
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.seeker = User.objects.create_user(username='seeker', password='password123', user_type='job_seeker')
+        self.profile, _ = JobSeekerProfile.objects.get_or_create(user=self.seeker)
+
+    def tearDown(self):
+        recommend.reset_index()
+
+    def make_job(self, title, description):
+        return Job.objects.create(recruiter=self.recruiter, title=title, description=description, location="Remote")
+
+    def test_index_ranks_by_skill_overlap(self):
+        index = recommend.JobTermIndex.build([
+            {"id": 3, "title": "Java Developer", "description": "Spring and SQL"},
+            {"id": 2, "title": "Python Developer", "description": "React and SQL"},
+            {"id": 1, "title": "Python Developer", "description": "Django and SQL"},
+        ])
+        query = index.vectorize(recommend.term_weights({"skills": "python, django"}, recommend.PROFILE_FIELD_WEIGHTS))
+
+        self.assertEqual(index.top(query, 2), [1, 2])
+        # Excluded jobs drop out and the newest non-match fills the gap
+        self.assertEqual(index.top(query, 2, exclude_ids={1}), [2, 3])
+        self.assertEqual(index.top({}, 3), [3, 2, 1])
+
+    def test_dashboard_follows_profile_and_applications(self):
+        python_job = self.make_job("Python Developer", "Django services")
+        self.make_job("Graphic Designer", "Figma")
+        self.profile.skills = "python"
+        self.profile.save()
+
+        self.assertEqual(recommend.recommended_job_ids(self.seeker, 1), [python_job.id])
+
+        Application.objects.create(job=python_job, applicant=self.seeker)
+        self.assertNotIn(python_job.id, recommend.recommended_job_ids(self.seeker))
+
+        self.client.login(username='seeker', password='password123')
+        response = self.client.get('/accounts/dashboard/jobseeker/')
+        self.assertEqual([job.title for job in response.context['recommended_jobs']], ["Graphic Designer"])
+
+    def test_new_jobs_rebuild_the_index_after_max_age(self):
+        self.make_job("Python Developer", "Django")
+        first = recommend.get_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_job("Rust Engineer", "Systems")
+        self.assertIs(recommend.get_index(), first)  # still within RECOMMENDATION_INDEX_MAX_AGE
+
+        first.built_at -= recommend.INDEX_MAX_AGE
+        self.assertEqual(len(recommend.get_index()), 2)
+
+    def test_index_is_refreshed_after_changes_in_other_processes(self):
+        job = self.make_job("Python Developer", "Django")
+        self.profile.skills = "rust"
+        self.profile.save()
+        first = recommend.get_index()
+        self.assertEqual(recommend.recommended_job_ids(self.seeker, 1), [job.id])
+
+        # Posted through another process, with a cache of its own
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'other',
+        }}), self.captureOnCommitCallbacks(execute=True):
+            rust = self.make_job("Rust Engineer", "Systems")
+        first.built_at -= recommend.INDEX_MAX_AGE
+        self.assertIs(recommend.get_index(), first)
+
+        first.built_at -= recommend.INDEX_REFRESH
+        self.assertEqual(len(recommend.get_index()), 2)
+        self.assertEqual(recommend.recommended_job_ids(self.seeker, 1), [rust.id])
+
+    @override_settings(TASKS_EAGER=False)
+    def test_outdated_index_is_rebuilt_off_the_request(self):
+        self.make_job("Python Developer", "Django")
+        first = recommend.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_job("Rust Engineer", "Systems")
+        first.built_at -= recommend.INDEX_MAX_AGE
+
+        with mock.patch.object(recommend.threading, "Thread") as thread:
+            self.assertIs(recommend.get_index(), first)
+            self.assertIs(recommend.get_index(), first)
+        # One rebuild at a time, however many requests see the old index
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        # What the thread runs, minus closing this test's connection
+        recommend._rebuild(*thread.call_args.kwargs["args"])
+        recommend._rebuilding.release()
+        self.assertEqual(len(recommend.get_index()), 2)
+
+
+class ApplicantRankingTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        recommend.reset_index()
+        self.recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.job = Job.objects.create(
+            recruiter=self.recruiter, title="Python Developer", description="Django REST services", location="Remote",
+        )
+        # Applied in this order, so newest first is designer, django, python
+        self.applicants = {}
+        for name, skills in [('python', 'python'), ('django', 'python, django, rest'), ('designer', 'figma')]:
+            user = User.objects.create_user(username=name, password='password123', user_type='job_seeker')
+            JobSeekerProfile.objects.update_or_create(user=user, defaults={'skills': skills})
+            Application.objects.create(job=self.job, applicant=user)
+            self.applicants[name] = user
+        self.client.login(username='recruiter', password='password123')
+
+    def tearDown(self):
+        recommend.reset_index()
+
+    def applicant_names(self, response):
+        return [application.applicant.username for application in response.context['applications']]
+
+    def test_score_profiles_in_one_batch(self):
+        vector = ranking.job_vector(self.job)
+        profiles = [{'skills': 'python, django, rest'}, {'skills': 'figma'}, {}, {'skills': 'python'}] * 500
+
+        scores = ranking.score_profiles(vector, profiles)
+
+        self.assertEqual(scores.shape, (2000,))
+        self.assertTrue(scores[0] > scores[3] > scores[1] == scores[2] == 0)
+        self.assertLessEqual(scores.max(), 1.0 + 1e-9)
+
+    def test_sort_by_match(self):
+        response = self.client.get(f'/jobs/job/{self.job.id}/applications/?sort=match')
+        self.assertEqual(self.applicant_names(response), ['django', 'python', 'designer'])
+        self.assertEqual(response.context['applications'][-1].match, 0)
+        self.assertContains(response, 'Best match')
+
+        response = self.client.get(f'/jobs/job/{self.job.id}/applicants/?sort=bogus')
+        self.assertEqual(response.context['sort'], 'newest')
+        self.assertEqual(self.applicant_names(response), ['designer', 'django', 'python'])
+
+    def test_job_vector_is_cached_until_the_job_changes(self):
+        vector = ranking.job_vector(self.job)
+        self.assertIn('django', vector)
+
+        self.job.description = "Flask services"
+        self.job.save()
+        vector = ranking.job_vector(self.job)
+        self.assertIn('flask', vector)
+        self.assertNotIn('django', vector)
+
+    @override_settings(TASKS_EAGER=False)
+    def test_ranking_never_builds_the_index_in_the_request(self):
+        with mock.patch.object(recommend.threading, "Thread") as thread, self.assertNumQueries(0):
+            vector = ranking.job_vector(self.job)
+        recommend._rebuilding.release()
+        thread.return_value.start.assert_called_once()
+        self.assertIn('django', vector)
+        self.assertIsNone(cache.get(ranking.JOB_VECTOR_KEY % self.job.pk))
+
+    def test_sort_by_match_query_budget(self):
+        recommend.get_index()
+        ranking.job_vector(self.job)
+        # session, user, job, applications, profiles and the two navbar counts
+        self.assertQueryBudget(f'/jobs/job/{self.job.id}/applications/?sort=match', 7)
+
+
+class ResumeUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        self.jobs = [
+            Job.objects.create(recruiter=recruiter, title=f"Job {i}", description="...", location="Remote")
+            for i in range(3)
+        ]
+        self.seeker = User.objects.create_user(username='seeker', password='password123', user_type='job_seeker')
+        self.client.login(username='seeker', password='password123')
+
+    def apply(self, job, resume=None):
+        data = {'resume': resume} if resume else {}
+        return self.client.post(f'/jobs/apply/{job.id}/', data)
+
+    def test_identical_resumes_are_stored_once(self):
+        content = b'%PDF-1.7 my resume'
+        self.apply(self.jobs[0], SimpleUploadedFile('cv.pdf', content, 'application/pdf'))
+        self.apply(self.jobs[1], SimpleUploadedFile('Resume (final).PDF', content, 'application/pdf'))
+
+        names = set(Application.objects.values_list('resume', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertRegex(name, r'^resumes/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        with Application.objects.first().resume.open('rb') as stored:
+            self.assertEqual(stored.read(), content)
+
+    def test_profile_resume_is_referenced_not_copied(self):
+        profile = self.seeker.jobseekerprofile
+        profile.resume = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 profile', 'application/pdf')
+        profile.save()
+
+        self.apply(self.jobs[2])
+        self.assertEqual(Application.objects.get().resume.name, profile.resume.name)
+
+    def test_rejected_uploads_create_no_application(self):
+        cases = [
+            SimpleUploadedFile('cv.exe', b'MZ', 'application/pdf'),
+            SimpleUploadedFile('cv.pdf', b'<html>not a pdf</html>', 'application/pdf'),
+        ]
+        with mock.patch.dict(uploads.UPLOAD_RULES['resume'], max_size=16):
+            cases.append(SimpleUploadedFile('cv.pdf', b'%PDF' + b'x' * 64, 'application/pdf'))
+            for resume in cases:
+                response = self.apply(self.jobs[0], resume)
+                self.assertRedirects(response, f'/jobs/apply/{self.jobs[0].id}/', fetch_redirect_response=False)
+
+        self.assertFalse(Application.objects.exists())
+        self.assertEqual(os.listdir(self.media_root), [])
@@ -2,10 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.db import transaction
 
+from . import ranking
 from .models import Job, Application, SavedJob
+from .search import search_jobs
+from .serializers import serialize_job, serialize_saved_job
 from accounts.models import User
+from skillbridge.pagination import paginate, render_page
+from skillbridge.uploads import upload_error
 
 
 # ----------------------------------------------------
@@ -58,14 +63,14 @@ def job_list(request):
     salary = request.GET.get("salary", "")
     job_type = request.GET.get("job_type", "")
 
-    jobs = Job.objects.all().order_by("-posted_on")
+    jobs = Job.objects.for_listing()
+    ordering = ("-posted_on", "-id")
 
     # ---------------- SEARCH ----------------
+    # Ranked, prefix-matched full-text search (see jobs/search.py)
     if search:
-        jobs = jobs.filter(
-            Q(title__icontains=search) |
-            Q(description__icontains=search)
-        )
+        jobs = search_jobs(jobs, search)
+        ordering = ("-search_rank",) + ordering
 
     # ---------------- LOCATION FILTER ----------------
     if location and location != "all":
@@ -92,10 +97,12 @@ def job_list(request):
             SavedJob.objects.filter(user=request.user).values_list("job_id", flat=True)
         )
 
-    return render(request, "jobs/job_list.html", {
-        "jobs": jobs,
+    page = paginate(request, jobs, ordering)
+
+    return render_page(request, "jobs/job_list.html", {
+        "jobs": page,
         "saved_job_ids": saved_job_ids
-    })
+    }, page, serialize_job)
 
 
 # ----------------------------------------------------
@@ -116,33 +123,31 @@ def apply_job(request, job_id):
         return redirect('job_list')
 
     if request.method == "POST":
+        # Rejected while streaming (size or type), see skillbridge/uploads.py
+        error = upload_error(request, "resume")
+        if error:
+            messages.error(request, error)
+            return redirect("apply_job", job_id=job.id)
+
         # Create new application
         resume_file = None
         
-        # 1. Try uploaded file
+        # 1. Try uploaded file; stored once however many applications send it
         if "resume" in request.FILES:
             resume_file = request.FILES["resume"]
         
-        # 2. Fallback to profile resume
+        # 2. Fallback to profile resume, which is referenced rather than copied
         elif hasattr(request.user, 'jobseekerprofile') and request.user.jobseekerprofile.resume:
-            resume_file = request.user.jobseekerprofile.resume
+            resume_file = request.user.jobseekerprofile.resume.name
             
-        Application.objects.create(
-            job=job,
-            applicant=request.user,
-            resume=resume_file
-        )
-
-        # Optional - Recruiter notification
-        try:
-            from messaging.models import Notification
-            Notification.objects.create(
-                user=job.recruiter,
-                message=f"{request.user.username} applied for your job: {job.title}",
-                url=f"/jobs/job/{job.id}/applicants/"
+        # The job's pending_count is bumped by a signal in the same transaction
+        with transaction.atomic():
+            Application.objects.create(
+                job=job,
+                applicant=request.user,
+                resume=resume_file
             )
-        except:
-            pass  # ignore if messaging app not added yet
+        # The recruiter is notified by messaging.signals.create_application_notification
 
         messages.success(request, f"You’ve successfully applied for {job.title}!")
         return redirect('job_list')
@@ -174,7 +179,7 @@ def save_job(request, job_id):
 
 @login_required
 def job_detail(request, job_id):
-    job = get_object_or_404(Job, id=job_id)
+    job = get_object_or_404(Job.objects.for_detail(), id=job_id)
 
     is_saved = False
     if request.user.user_type == "job_seeker":
@@ -191,11 +196,12 @@ def saved_jobs(request):
         messages.error(request, "Only job seekers can view saved jobs.")
         return redirect("home")
 
-    saved = SavedJob.objects.filter(user=request.user).select_related("job")
+    saved = SavedJob.objects.for_user(request.user)
+    page = paginate(request, saved, ("-saved_on", "-id"))
 
-    return render(request, "jobs/saved_jobs.html", {
-        "saved_jobs": saved
-    })
+    return render_page(request, "jobs/saved_jobs.html", {
+        "saved_jobs": page
+    }, page, serialize_saved_job)
 
 # ----------------------------------------------------
 # RECRUITER MANAGE JOBS
@@ -206,10 +212,23 @@ def my_jobs(request):
         messages.error(request, "Access denied. Recruiters only.")
         return redirect('home')
 
-    jobs = Job.objects.filter(recruiter=request.user).order_by('-posted_on')
-    return render(request, "jobs/recruiter_jobs.html", {
-        "jobs": jobs
-    })
+    jobs = Job.objects.for_recruiter(request.user)
+    page = paginate(request, jobs, ("-posted_on", "-id"))
+    return render_page(request, "jobs/recruiter_jobs.html", {
+        "jobs": page
+    }, page, serialize_job)
+
+
+def applicants_for(request, job):
+    """The job's applications in the ``?sort=`` order the recruiter picked."""
+    sort = request.GET.get("sort")
+    if sort not in ranking.SORT_CHOICES:
+        sort = ranking.SORT_NEWEST
+
+    applications = Application.objects.for_job_listing(job)
+    if sort == ranking.SORT_MATCH:
+        applications = ranking.rank_applications(job, applications)
+    return applications, sort
 
 
 @login_required
@@ -221,17 +240,18 @@ def view_applicants(request, job_id):
         messages.error(request, "Access denied. Recruiters only.")
         return redirect('home')
 
-    if job.recruiter != request.user:
+    if job.recruiter_id != request.user.id:
         messages.error(request, "Access denied. You do not own this job.")
         return redirect('my_jobs')
 
-    # 2. Fetch applications
-    applications = Application.objects.filter(job=job).select_related('applicant').order_by('-applied_on')
+    # 2. Fetch applications, newest first or ranked by profile match
+    applications, sort = applicants_for(request, job)
 
     # 3. Render template with context
     return render(request, "jobs/view_applicants.html", {
         "job": job,
-        "applications": applications
+        "applications": applications,
+        "sort": sort,
     })
 
 
@@ -277,10 +297,11 @@ def recruiter_jobs(request):
         messages.error(request, "Access denied. Recruiters only.")
         return redirect('home')
 
-    jobs = Job.objects.filter(recruiter=request.user).order_by('-posted_on')
-    return render(request, "jobs/recruiter_jobs.html", {
-        "jobs": jobs
-    })
+    jobs = Job.objects.for_recruiter(request.user)
+    page = paginate(request, jobs, ("-posted_on", "-id"))
+    return render_page(request, "jobs/recruiter_jobs.html", {
+        "jobs": page
+    }, page, serialize_job)
 
 
 @login_required
@@ -290,22 +311,23 @@ def job_applicants(request, job_id):
     if request.user.user_type != 'recruiter':
         return HttpResponseForbidden("Access denied. Recruiters only.")
 
-    if job.recruiter != request.user:
+    if job.recruiter_id != request.user.id:
         return HttpResponseForbidden("Access denied. You do not own this job.")
 
-    applications = Application.objects.filter(job=job).select_related('applicant').order_by('-applied_on')
+    applications, sort = applicants_for(request, job)
 
     return render(request, "jobs/job_applicants.html", {
         "job": job,
-        "applications": applications
+        "applications": applications,
+        "sort": sort,
     })
 
 
 @login_required
 def applicant_detail(request, application_id):
-    application = get_object_or_404(Application, id=application_id)
+    application = get_object_or_404(Application.objects.for_detail(), id=application_id)
     
-    if request.user.user_type != 'recruiter' or application.job.recruiter != request.user:
+    if request.user.user_type != 'recruiter' or application.job.recruiter_id != request.user.id:
         return HttpResponseForbidden("Access denied. You do not own this application.")
 
     return render(request, "jobs/applicant_detail.html", {
@@ -315,35 +337,37 @@ def applicant_detail(request, application_id):
 
 @login_required
 def accept_application(request, application_id):
-    application = get_object_or_404(Application, id=application_id)
+    application = get_object_or_404(Application.objects.for_detail(), id=application_id)
     
-    if request.user.user_type != 'recruiter' or application.job.recruiter != request.user:
+    if request.user.user_type != 'recruiter' or application.job.recruiter_id != request.user.id:
         return HttpResponseForbidden("Access denied. You do not own this application.")
 
     if application.status in ['accepted', 'rejected']:
         messages.warning(request, "This application has already been processed.")
-        return redirect('job_applicants', job_id=application.job.id)
+        return redirect('job_applicants', job_id=application.job_id)
 
-    application.status = 'accepted'
-    application.save()
+    if not application.set_status('accepted', expected='pending'):
+        messages.warning(request, "This application has already been processed.")
+        return redirect('job_applicants', job_id=application.job_id)
     
     messages.success(request, f"Application for {application.applicant.username} accepted.")
-    return redirect('job_applicants', job_id=application.job.id)
+    return redirect('job_applicants', job_id=application.job_id)
 
 
 @login_required
 def reject_application(request, application_id):
-    application = get_object_or_404(Application, id=application_id)
+    application = get_object_or_404(Application.objects.for_detail(), id=application_id)
     
-    if request.user.user_type != 'recruiter' or application.job.recruiter != request.user:
+    if request.user.user_type != 'recruiter' or application.job.recruiter_id != request.user.id:
         return HttpResponseForbidden("Access denied. You do not own this application.")
 
     if application.status in ['accepted', 'rejected']:
         messages.warning(request, "This application has already been processed.")
-        return redirect('job_applicants', job_id=application.job.id)
+        return redirect('job_applicants', job_id=application.job_id)
 
-    application.status = 'rejected'
-    application.save()
+    if not application.set_status('rejected', expected='pending'):
+        messages.warning(request, "This application has already been processed.")
+        return redirect('job_applicants', job_id=application.job_id)
     
     messages.warning(request, f"Application for {application.applicant.username} rejected.")
-    return redirect('job_applicants', job_id=application.job.id)
+    return redirect('job_applicants', job_id=application.job_id)
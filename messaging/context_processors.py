@@ -1,7 +1,19 @@
-from .models import Notification
+from functools import cache
+from django.db.models import Sum
+from .models import Participant
+from . import unread
 
 def notification_counts(request):
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-        return {'unread_count': unread_count}
+        # Templates call callables, so these only run on pages that show the badges
+        @cache
+        def unread_count():
+            return unread.get_count(request.user.id)
+
+        @cache
+        def unread_messages_count():
+            total = Participant.objects.filter(user=request.user).aggregate(total=Sum('unread_count'))['total']
+            return total or 0
+
+        return {'unread_count': unread_count, 'unread_messages_count': unread_messages_count}
     return {}
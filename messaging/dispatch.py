@@ -0,0 +1,73 @@
+"""
+Batched notification delivery.
+
+Code that wants to notify someone calls ``notify()`` / ``notify_many()``
+instead of ``Notification.objects.create``. Inside a ``collect()`` scope
+(every request gets one from NotificationBatchMiddleware) notifications are
+buffered, deduplicated by (user, kind, target) and written with a single
+``bulk_create`` once the surrounding transaction commits. Outside a scope
+(shell, management commands) they are written immediately, as before.
+
+The INSERT itself is queued for the task worker; the live updates are
+published from the process that built the notifications, which is the one
+holding the browsers' event streams.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import transaction
+
+from . import realtime, tasks
+from .models import Notification
+
+_pending = ContextVar('pending_notifications', default=None)
+
+
+@contextmanager
+def collect():
+    """Buffer notifications until the block exits; nested scopes share the outer buffer."""
+    if _pending.get() is not None:
+        yield
+        return
+
+    token = _pending.set({})
+    try:
+        yield
+    except BaseException:
+        # Whatever failed, its notifications must not go out
+        _pending.reset(token)
+        raise
+    pending = _pending.get()
+    _pending.reset(token)
+    if pending:
+        transaction.on_commit(partial(write, list(pending.values())))
+
+
+def notify(user, message, url=None, kind='general', target=None):
+    notify_many([user], message, url=url, kind=kind, target=target)
+
+
+def notify_many(users, message, url=None, kind='general', target=None):
+    """
+    Queue the same notification for several users (instances or ids).
+    ``target`` identifies what the notification is about (defaults to
+    ``url``); a later notification with the same (user, kind, target) in
+    the same batch replaces the earlier one.
+    """
+    target = url if target is None else target
+    notes = {}
+    for user in users:
+        user_id = getattr(user, 'pk', user)
+        notes[(user_id, kind, target)] = Notification(user_id=user_id, message=message, url=url)
+
+    pending = _pending.get()
+    if pending is None:
+        write(list(notes.values()))
+    else:
+        pending.update(notes)
+
+
+def write(notes):
+    tasks.save_notifications.enqueue([[note.user_id, note.message, note.url] for note in notes])
+    transaction.on_commit(partial(realtime.publish_notifications, notes))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from messaging.models import Conversation, Message, Participant
+
+
+class Command(BaseCommand):
+    help = 'Fills in Conversation.last_message/last_message_at and per-participant unread counts from existing messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows updated per UPDATE statement.')
+
+    def handle(self, *args, **options):
+        latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+        conversations = self.in_batches(Conversation, options['batch_size'], lambda batch: batch.update(
+            last_message=Subquery(latest.values('id')[:1]),
+            last_message_at=Subquery(latest.values('timestamp')[:1]),
+        ))
+
+        unread = (
+            Message.objects.filter(conversation=OuterRef('conversation'), is_read=False)
+            .exclude(sender=OuterRef('user'))
+            .order_by()
+            .values('conversation')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        participants = self.in_batches(Participant, options['batch_size'], lambda batch: batch.update(
+            unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0),
+        ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled {conversations} conversations and {participants} participants.'
+        ))
+
+    def in_batches(self, model, batch_size, update):
+        last_id, updated = 0, 0
+        while True:
+            ids = list(model.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return updated
+            with transaction.atomic():
+                updated += update(model.objects.filter(id__gte=ids[0], id__lte=ids[-1]))
+            last_id = ids[-1]
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from messaging.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacts the notification table: collapses repeated read notifications '
+        '(same user, link and text) down to the newest one, and deletes read '
+        'notifications past the retention period. Unread notifications are never touched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collapse-after', type=int,
+                            default=getattr(settings, 'NOTIFICATION_COLLAPSE_DAYS', 7),
+                            help='Age in days after which repeated read notifications are collapsed.')
+        parser.add_argument('--retention', type=int,
+                            default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90),
+                            help='Age in days after which read notifications are deleted.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows scanned per DELETE statement.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many notifications would be removed.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        read = Notification.objects.filter(is_read=True)
+
+        newer_duplicate = read.filter(
+            user=OuterRef('user'),
+            url=OuterRef('url'),
+            message=OuterRef('message'),
+            created_at__gt=OuterRef('created_at'),
+        )
+        collapsible = read.filter(
+            url__isnull=False,
+            created_at__lt=now - timedelta(days=options['collapse_after']),
+        ).filter(Exists(newer_duplicate))
+        expired = read.filter(created_at__lt=now - timedelta(days=options['retention']))
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'Would collapse {collapsible.count()} and expire {expired.count()} notifications.'
+            )
+            return
+
+        collapsed = self.delete_in_batches(collapsible, options['batch_size'])
+        deleted = self.delete_in_batches(expired, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Collapsed {collapsed} repeated and deleted {deleted} expired notifications.'
+        ))
+
+    def delete_in_batches(self, queryset, batch_size):
+        # Walk the id range so each DELETE stays short instead of
+        # locking the whole table in one statement
+        last_id, deleted = 0, 0
+        while True:
+            ids = list(
+                Notification.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            with transaction.atomic():
+                deleted += queryset.filter(id__gte=ids[0], id__lte=ids[-1]).delete()[0]
+            last_id = ids[-1]
@@ -0,0 +1,15 @@
+from .dispatch import collect
+
+
+class NotificationBatchMiddleware:
+    """
+    Collects every notification raised while handling a request and writes
+    them in one INSERT when the request's work has committed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect():
+            return self.get_response(request)
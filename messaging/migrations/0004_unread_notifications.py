@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_unread(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UnreadNotifications = apps.get_model('messaging', 'UnreadNotifications')
+    users = User.objects.annotate(unread=Count('notifications', filter=Q(notifications__is_read=False)))
+    UnreadNotifications.objects.bulk_create(
+        (UnreadNotifications(user_id=user_id, count=unread) for user_id, unread in users.values_list('id', 'unread').iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_avatar_thumbnails_ready'),
+        ('messaging', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotifications',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -2,12 +2,32 @@ from django.db import models
 from accounts.models import User
 
 class Conversation(models.Model):
-    participants = models.ManyToManyField(User, related_name='conversations')
-    updated_at = models.DateTimeField(auto_now=True)
+    participants = models.ManyToManyField(User, related_name='conversations', through='Participant')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Denormalized by messaging.signals when a Message is created,
+    # so the inbox never has to read the Message table
+    last_message = models.ForeignKey(
+        'Message', related_name='+', on_delete=models.SET_NULL, null=True, blank=True
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"Conversation {self.id}"
 
+class Participant(models.Model):
+    # Keeps the table of the original auto-created M2M
+    conversation = models.ForeignKey(Conversation, related_name='memberships', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='conversation_memberships', on_delete=models.CASCADE)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'messaging_conversation_participants'
+        unique_together = ('conversation', 'user')
+
+    def __str__(self):
+        return f"{self.user.username} in conversation {self.conversation_id}"
+
 class Message(models.Model):
     conversation = models.ForeignKey(Conversation, related_name='messages', on_delete=models.CASCADE, null=True, blank=True)
     sender = models.ForeignKey(User, related_name='sent_messages', on_delete=models.CASCADE)
@@ -15,6 +35,12 @@ class Message(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Chat window and history pages: (-timestamp, -id) within a conversation
+            models.Index(fields=['conversation', '-timestamp', '-id'], name='message_conversation_time_idx'),
+        ]
+
     def __str__(self):
         return f"Message {self.id} from {self.sender.username}"
 
@@ -25,7 +51,28 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # The notification feed
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+            # Unread badge count and mark-all-read only touch unread rows
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            # compact_notifications
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='notification_read_created_idx'),
+        ]
+
     def __str__(self):
         return self.message
 
 
+class UnreadNotifications(models.Model):
+    """
+    A user's unread notification count for the navbar badge, kept in step
+    with the Notification table by messaging.unread. In the database, so
+    the worker that writes notifications and every web process agree.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count} unread"
@@ -0,0 +1,136 @@
+"""
+Live updates for chats and the navbar badges.
+
+Browsers keep one Server-Sent Events connection open to ``event_stream``
+(messaging.views) and receive JSON events on their own ``user:<id>``
+channel:
+
+* ``message``       a new message in one of their conversations
+* ``read``          the other side opened a conversation (read receipts)
+* ``notification``  a notification was written for them
+
+Events are published after the transaction that produced them commits.
+Delivery goes through a broker chosen by ``settings.REALTIME_BROKER``
+(a dotted path). The default ``InMemoryBroker`` only fans out to streams
+held by the same process, which is enough for a single ASGI worker or for
+development. A multi-process deployment can plug in a backend with the
+same ``publish`` / ``subscribe`` interface (Redis pub/sub, Postgres
+LISTEN/NOTIFY, ...) without touching the callers.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .serializers import serialize_message, serialize_notification
+
+logger = logging.getLogger('skillbridge.realtime')
+
+# Events buffered per connection before a slow client starts losing them
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class BaseBroker:
+    def publish(self, channel, event):
+        """Deliver ``event`` (a JSON-serializable dict) to every subscriber of ``channel``."""
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        """
+        Async context manager yielding an ``asyncio.Queue`` that receives the
+        events published to ``channel`` while the context is open.
+        """
+        raise NotImplementedError
+
+
+class InMemoryBroker(BaseBroker):
+    """
+    Process-local fan-out. ``publish`` is called from synchronous code
+    (views and signal handlers running in worker threads), so events are
+    handed to each subscriber's event loop with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        # channel -> {queue: loop}
+        self._subscribers = defaultdict(dict)
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, {}).items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, channel, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down without unsubscribing
+                self._unsubscribe(channel, queue)
+
+    def _deliver(self, channel, queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping event for slow subscriber on %s", channel)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[channel][queue] = asyncio.get_running_loop()
+        try:
+            yield queue
+        finally:
+            self._unsubscribe(channel, queue)
+
+    def _unsubscribe(self, channel, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.pop(queue, None)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+@cache
+def get_broker():
+    return import_string(getattr(settings, 'REALTIME_BROKER', 'messaging.realtime.InMemoryBroker'))()
+
+
+def publish_to_users(user_ids, event):
+    broker = get_broker()
+    for user_id in user_ids:
+        broker.publish(user_channel(user_id), event)
+
+
+# ----------------------------------------------------
+# EVENTS
+# ----------------------------------------------------
+def publish_message(message, participant_ids):
+    publish_to_users(participant_ids, {'type': 'message', 'message': serialize_message(message)})
+
+
+def publish_read(conversation_id, reader_id, participant_ids):
+    event = {'type': 'read', 'conversation': conversation_id, 'reader': reader_id}
+    publish_to_users([pk for pk in participant_ids if pk != reader_id], event)
+
+
+def publish_notifications(notes):
+    broker = get_broker()
+    for note in notes:
+        broker.publish(
+            user_channel(note.user_id),
+            {'type': 'notification', 'notification': serialize_notification(note)},
+        )
@@ -0,0 +1,26 @@
+"""
+Plain-dict representations of messages and notifications, shared by the
+JSON views and the events pushed over the live stream.
+"""
+
+
+def serialize_message(message):
+    return {
+        'id': message.id,
+        'conversation': message.conversation_id,
+        'sender_id': message.sender_id,
+        'sender': message.sender.username,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+        'is_read': message.is_read,
+    }
+
+
+def serialize_notification(note):
+    return {
+        'id': note.id,
+        'message': note.message,
+        'url': note.url,
+        'is_read': note.is_read,
+        'created_at': note.created_at.isoformat() if note.created_at else None,
+    }
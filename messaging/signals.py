@@ -1,44 +1,77 @@
+from functools import partial
+from django.db import transaction
+from django.db.models import F
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from .models import Message, Notification, Conversation
-from jobs.models import Application
 from django.urls import reverse
+from .models import Message, Conversation, Participant, UnreadNotifications
+from .dispatch import notify, notify_many
+from . import realtime
+from jobs.models import Application
+from accounts.models import User
 
-@receiver(post_save)
+@receiver(post_save, sender=Message)
 def create_message_notification(sender, instance, created, **kwargs):
-    if sender.__name__ != 'Message':
-        return
     if created:
-        conversation = instance.conversation
-        # Notify all participants EXCEPT the sender
-        for participant in conversation.participants.all():
-            if participant != instance.sender:
-                Notification.objects.create(
-                    user=participant,
-                    message=f"New message from {instance.sender.username}",
-                    url=reverse('chat_view', args=[conversation.id])
-                )
+        # Notify all participants EXCEPT the sender; the INSERT is queued
+        recipient_ids = Participant.objects.filter(conversation_id=instance.conversation_id).exclude(
+            user_id=instance.sender_id
+        ).values_list('user_id', flat=True)
+        notify_many(
+            recipient_ids,
+            message=f"New message from {instance.sender.username}",
+            url=reverse('chat_view', args=[instance.conversation_id]),
+            kind='message',
+            target=instance.conversation_id,
+        )
+
+@receiver(post_save, sender=Message)
+def update_conversation_summary(sender, instance, created, **kwargs):
+    # Runs inside the transaction that created the message (see chat_view)
+    if not created or instance.conversation_id is None:
+        return
+    Conversation.objects.filter(pk=instance.conversation_id).update(
+        last_message=instance,
+        last_message_at=instance.timestamp,
+        updated_at=instance.timestamp,
+    )
+    Participant.objects.filter(conversation_id=instance.conversation_id).exclude(
+        user_id=instance.sender_id
+    ).update(unread_count=F('unread_count') + 1)
+
+@receiver(post_save, sender=Message)
+def push_message(sender, instance, created, **kwargs):
+    if not created or instance.conversation_id is None:
+        return
+    participant_ids = list(
+        Participant.objects.filter(conversation_id=instance.conversation_id).values_list('user_id', flat=True)
+    )
+    # Sender included, so their other open tabs pick the message up too
+    transaction.on_commit(partial(realtime.publish_message, instance, participant_ids))
 
 @receiver(post_save, sender=Application)
 def create_application_notification(sender, instance, created, **kwargs):
     if created:
         # 1. Notify Recruiter of new application
-        recruiter = instance.job.recruiter
-        Notification.objects.create(
-            user=recruiter,
+        notify(
+            instance.job.recruiter_id,
             message=f"New application for {instance.job.title} from {instance.applicant.username}",
-            url=reverse('recruiter_applications')
+            url=reverse('recruiter_applications'),
+            kind='application',
+            target=instance.job_id,
         )
-    else:
-        # 2. Notify Applicant of status change (simplified check)
-        # In a real app, we'd check if 'status' field changed using __init__ tracking or similar,
-        # but for now, we assume save() on existing app implies update.
-        # Ideally, we should check if status specifically changed to avoid spam.
-        # However, for this task, let's keep it simple or check against 'pending'.
-        
-        if instance.status != 'pending': # Assuming default is pending
-             Notification.objects.create(
-                user=instance.applicant,
-                message=f"Update on your application for {instance.job.title}: {instance.status.title()}",
-                url=reverse('my_applications')
-            )
+    elif instance.status != 'pending':
+        # 2. Notify Applicant of status change
+        notify(
+            instance.applicant_id,
+            message=f"Update on your application for {instance.job.title}: {instance.status.title()}",
+            url=reverse('my_applications'),
+            kind='application_status',
+            target=instance.id,
+        )
+
+@receiver(post_save, sender=User)
+def create_unread_notifications(sender, instance, created, raw=False, **kwargs):
+    # So the badge never has to count a new user's notifications
+    if created and not raw:
+        UnreadNotifications.objects.create(user=instance)
@@ -0,0 +1,15 @@
+"""
+Notification writes, queued by messaging.dispatch so the request that
+caused them only pays for one INSERT into the task queue.
+"""
+from tasks.queue import task
+from . import unread
+from .models import Notification
+
+
+@task
+def save_notifications(rows):
+    notes = Notification.objects.bulk_create(
+        Notification(user_id=user_id, message=message, url=url) for user_id, message, url in rows
+    )
+    unread.notes_added(notes)
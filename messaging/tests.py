@@ -1,6 +1,24 @@
-from django.test import TestCase, Client
+import asyncio
+from io import StringIO
+from unittest import mock
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
+from django.core.cache import cache
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message
+from .models import Conversation, Message, Notification, Participant, UnreadNotifications
+from .dispatch import collect
+from . import realtime, unread
+from .signals import create_message_notification
+from .views import CHAT_PAGE_SIZE, stream_events
+from django.db.models.signals import post_save
+from skillbridge.signal_profiler import SignalProfiler
+from skillbridge.pagination import PAGE_SIZE
+from skillbridge.testing import QueryBudgetMixin, QueryPlanMixin
+from jobs.models import Job
+from tasks.models import Task
 
 User = get_user_model()
 
@@ -123,3 +141,344 @@ class MessagingTests(TestCase):
         self.assertIn("New message", note.message)
 
 
+class NotificationDispatchTests(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user(username='sender', password='password123')
+        self.others = [User.objects.create_user(username=f'member{i}', password='password123') for i in range(3)]
+        self.convo = Conversation.objects.create()
+        self.convo.participants.add(self.sender, *self.others)
+
+    def test_fan_out_is_one_insert_and_deduplicated(self):
+        with self.captureOnCommitCallbacks(execute=True), collect():
+            Message.objects.create(conversation=self.convo, sender=self.sender, content="One")
+            Message.objects.create(conversation=self.convo, sender=self.sender, content="Two")
+            self.assertEqual(Notification.objects.count(), 0)
+
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user__username', flat=True)),
+            ['member0', 'member1', 'member2'],
+        )
+
+    def test_failed_block_sends_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with collect():
+                Message.objects.create(conversation=self.convo, sender=self.sender, content="Lost")
+                raise RuntimeError
+        self.assertFalse(Notification.objects.exists())
+
+    def test_apply_notifies_recruiter_once(self):
+        recruiter = User.objects.create_user(username='recruiter', password='password123', user_type='recruiter')
+        job = Job.objects.create(recruiter=recruiter, title="Tester", description="QA", location="Remote")
+
+        self.client.login(username='member0', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/jobs/apply/{job.id}/')
+        self.assertEqual(Notification.objects.filter(user=recruiter).count(), 1)
+
+
+    @override_settings(TASKS_EAGER=False)
+    def test_notifications_are_queued_for_the_worker(self):
+        Message.objects.create(conversation=self.convo, sender=self.sender, content="Later")
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(Task.objects.get().name, 'messaging.tasks.save_notifications')
+
+        call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertFalse(Task.objects.exists())
+
+
+class SignalScopeTests(TestCase):
+    def test_message_receiver_ignores_other_models(self):
+        convo = Conversation.objects.create()
+        receivers = [
+            receiver for receiver, _ in post_save.send(
+                sender=Conversation, instance=convo, created=False, raw=False, using='default', update_fields=None
+            )
+        ]
+        self.assertNotIn(create_message_notification, receivers)
+
+    def test_profiler_logs_receivers_per_save(self):
+        profiler = SignalProfiler()
+        profiler.install()
+        try:
+            with self.assertLogs('skillbridge.signals', level='INFO') as logs:
+                User.objects.create_user(username='profiled', password='password123')
+        finally:
+            profiler.uninstall()
+
+        self.assertTrue(any('post_save accounts.User' in line for line in logs.output))
+        sends, receivers, elapsed = profiler.totals[('post_save', 'accounts.User')]
+        self.assertGreaterEqual(receivers, 2)
+        self.assertEqual(post_save.send.__name__, 'send')
+
+
+class InboxQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', password='password123')
+        self.client.login(username='owner', password='password123')
+
+    def add_conversations(self, count):
+        for i in range(count):
+            other = User.objects.create_user(username=f'contact{Conversation.objects.count()}', password='password123')
+            convo = Conversation.objects.create()
+            convo.participants.add(self.user, other)
+            Message.objects.create(conversation=convo, sender=other, content=f"Hello {i}")
+            Message.objects.create(conversation=convo, sender=other, content=f"Latest {i}")
+
+    def test_inbox_query_count_is_constant(self):
+        self.add_conversations(2)
+        # session, user, both badges, memberships, other participants
+        self.client.get('/messages/')
+        with self.assertNumQueries(6):
+            self.client.get('/messages/')
+
+        self.add_conversations(10)
+        with self.assertNumQueries(6):
+            response = self.client.get('/messages/')
+
+        self.assertContains(response, "Latest 9")
+        self.assertNotContains(response, "Hello 9")
+        convo = response.context['conversations'][0]
+        self.assertEqual(convo.unread_count, 2)
+        self.assertNotEqual(convo.other_user, self.user)
+
+    def test_opening_chat_resets_unread_count(self):
+        self.add_conversations(1)
+        convo = Conversation.objects.get()
+        self.client.get(f'/messages/chat/{convo.id}/')
+
+        self.assertEqual(Participant.objects.get(conversation=convo, user=self.user).unread_count, 0)
+        self.assertFalse(convo.messages.filter(is_read=False).exists())
+
+    def test_backfill_rebuilds_summary_columns(self):
+        self.add_conversations(2)
+        Conversation.objects.update(last_message=None, last_message_at=None)
+        Participant.objects.update(unread_count=0)
+
+        call_command('backfill_conversations', stdout=StringIO())
+
+        for convo in Conversation.objects.select_related('last_message'):
+            self.assertTrue(convo.last_message.content.startswith("Latest"))
+            self.assertEqual(convo.last_message_at, convo.last_message.timestamp)
+        self.assertEqual(Participant.objects.get(conversation=convo, user=self.user).unread_count, 2)
+
+
+class ChatHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='password123')
+        self.other = User.objects.create_user(username='writer', password='password123')
+        self.convo = Conversation.objects.create()
+        self.convo.participants.add(self.user, self.other)
+        Message.objects.bulk_create([
+            Message(conversation=self.convo, sender=self.other if i % 2 else self.user, content=f"msg {i:03d}")
+            for i in range(CHAT_PAGE_SIZE + 15)
+        ])
+        self.client.login(username='reader', password='password123')
+
+    def test_chat_renders_newest_window_only(self):
+        response = self.client.get(f'/messages/chat/{self.convo.id}/')
+        contents = [msg.content for msg in response.context['messages']]
+
+        self.assertEqual(len(contents), CHAT_PAGE_SIZE)
+        self.assertEqual(contents[-1], f"msg {CHAT_PAGE_SIZE + 14:03d}")
+        self.assertEqual(contents[0], "msg 015")
+        self.assertTrue(response.context['has_user_sent'])
+        self.assertIsNotNone(response.context['older_cursor'])
+
+    def test_history_endpoint_returns_older_messages(self):
+        cursor = self.client.get(f'/messages/chat/{self.convo.id}/').context['older_cursor']
+        data = self.client.get(f'/messages/chat/{self.convo.id}/history/', {'cursor': cursor}).json()
+
+        self.assertEqual([msg['content'] for msg in data['results']], [f"msg {i:03d}" for i in range(15)])
+        self.assertIsNone(data['next'])
+
+    def test_history_requires_membership(self):
+        User.objects.create_user(username='outsider', password='password123')
+        self.client.login(username='outsider', password='password123')
+        response = self.client.get(f'/messages/chat/{self.convo.id}/history/')
+        self.assertEqual(response.status_code, 403)
+
+
+class RealtimeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='live', password='password123')
+        self.other = User.objects.create_user(username='peer', password='password123')
+        self.convo = Conversation.objects.create()
+        self.convo.participants.add(self.user, self.other)
+
+    async def test_broker_fans_out_across_threads(self):
+        broker = realtime.InMemoryBroker()
+        async with broker.subscribe('user:1') as first, broker.subscribe('user:1') as second:
+            # Publishers run in sync worker threads
+            await asyncio.to_thread(broker.publish, 'user:1', {'type': 'read'})
+            broker.publish('user:2', {'type': 'ignored'})
+            self.assertEqual(await asyncio.wait_for(first.get(), 1), {'type': 'read'})
+            self.assertEqual(await asyncio.wait_for(second.get(), 1), {'type': 'read'})
+            self.assertTrue(first.empty())
+        self.assertEqual(broker.subscriber_count('user:1'), 0)
+
+    def test_new_message_is_pushed_after_commit(self):
+        with mock.patch.object(realtime, 'publish_to_users') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                message = Message.objects.create(conversation=self.convo, sender=self.user, content="ping")
+                publish.assert_not_called()
+
+        user_ids, event = publish.call_args.args
+        self.assertCountEqual(user_ids, [self.user.id, self.other.id])
+        self.assertEqual((event['type'], event['message']['id']), ('message', message.id))
+
+    def test_opening_chat_pushes_read_receipt(self):
+        Message.objects.create(conversation=self.convo, sender=self.other, content="hello")
+        self.client.login(username='live', password='password123')
+
+        with mock.patch.object(realtime, 'publish_to_users') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get(f'/messages/chat/{self.convo.id}/')
+
+        publish.assert_called_once_with(
+            [self.other.id], {'type': 'read', 'conversation': self.convo.id, 'reader': self.user.id}
+        )
+
+    def test_chat_post_returns_json_for_fetch(self):
+        self.client.login(username='live', password='password123')
+        response = self.client.post(
+            f'/messages/chat/{self.convo.id}/', {'content': 'no reload'}, HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['content'], 'no reload')
+
+    def test_stream_is_refused_under_wsgi(self):
+        self.client.login(username='live', password='password123')
+        self.assertEqual(self.client.get('/messages/stream/').status_code, 204)
+
+    async def test_stream_is_served_under_asgi(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get('/messages/stream/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+    async def test_stream_delivers_user_events(self):
+        broker = realtime.get_broker()
+        channel = realtime.user_channel(self.user.id)
+        stream = stream_events(self.user.id)
+
+        self.assertEqual(await anext(stream), 'retry: 5000\n\n')
+        broker.publish(channel, {'type': 'notification', 'n': 1})
+        self.assertEqual(
+            await asyncio.wait_for(anext(stream), 1),
+            'event: notification\ndata: {"type": "notification", "n": 1}\n\n',
+        )
+        await stream.aclose()
+        self.assertEqual(broker.subscriber_count(channel), 0)
+
+
+class NotificationFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='password123')
+        Notification.objects.bulk_create([
+            Notification(user=self.user, message=f"Note {i}", url='/jobs/') for i in range(PAGE_SIZE + 5)
+        ])
+        self.client.login(username='reader', password='password123')
+
+    def test_feed_is_paginated_and_marked_read_in_one_update(self):
+        # session, user, page, UPDATE, unread count reset, messages badge
+        with self.assertNumQueries(6):
+            response = self.client.get('/messages/notifications/')
+
+        self.assertEqual(len(response.context['notifications']), PAGE_SIZE)
+        self.assertFalse(response.context['notifications'].object_list[0].is_read)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertContains(response, 'cursor=')
+
+    def test_compaction_collapses_and_expires_read_notifications(self):
+        now = timezone.now()
+        Notification.objects.all().delete()
+
+        def make(days, **kwargs):
+            note = Notification.objects.create(user=self.user, **kwargs)
+            Notification.objects.filter(id=note.id).update(created_at=now - timedelta(days=days))
+            return note.id
+
+        ids = {
+            'old_dup': make(20, message="New message from a", url='/c/1/', is_read=True),
+            'new_dup': make(10, message="New message from a", url='/c/1/', is_read=True),
+            'unread_dup': make(30, message="New message from a", url='/c/1/'),
+            'expired': make(120, message="Welcome", url='/', is_read=True),
+            'expired_unread': make(120, message="Welcome", url='/'),
+        }
+
+        call_command('compact_notifications', '--batch-size', '2', stdout=StringIO())
+
+        remaining = set(Notification.objects.values_list('id', flat=True))
+        self.assertEqual(remaining, {ids['new_dup'], ids['unread_dup'], ids['expired_unread']})
+
+
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='badge', password='password123')
+        self.other = User.objects.create_user(username='poster', password='password123')
+        self.convo = Conversation.objects.create()
+        self.convo.participants.add(self.user, self.other)
+        self.client.login(username='badge', password='password123')
+
+    def test_count_is_maintained_without_counting(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(unread.get_count(self.user.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.create(conversation=self.convo, sender=self.other, content="hi")
+        with self.assertNumQueries(1):
+            self.assertEqual(unread.get_count(self.user.id), 1)
+
+        self.client.get('/messages/notifications/')
+        with self.assertNumQueries(1):
+            self.assertEqual(unread.get_count(self.user.id), 0)
+
+    def test_missing_row_falls_back_to_database(self):
+        UnreadNotifications.objects.filter(user=self.user).delete()
+        Notification.objects.create(user=self.user, message="Direct insert")
+        with self.assertNumQueries(3):  # counter row, recount, counter INSERT
+            self.assertEqual(unread.get_count(self.user.id), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(unread.get_count(self.user.id), 1)
+
+    @override_settings(TASKS_EAGER=False)
+    def test_notifications_written_by_the_worker_reach_the_badge(self):
+        self.assertEqual(unread.get_count(self.user.id), 0)
+        Message.objects.create(conversation=self.convo, sender=self.other, content="hi")
+
+        # The worker runs in another process with a cache of its own
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                                   'LOCATION': 'worker'}}):
+            call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertEqual(unread.get_count(self.user.id), 1)
+
+    def test_badge_count_is_lazy(self):
+        # The JSON history endpoint renders no template, so no badge queries
+        with self.assertNumQueries(4):  # session, user, membership check, one page of messages
+            self.client.get(f'/messages/chat/{self.convo.id}/history/')
+
+
+class QueryPlanTests(QueryPlanMixin, QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='planner', password='password123')
+        other = User.objects.create_user(username='other', password='password123')
+        self.convo = Conversation.objects.create()
+        self.convo.participants.add(self.user, other)
+        Message.objects.create(conversation=self.convo, sender=other, content="Indexed")
+        self.client.login(username='planner', password='password123')
+
+    def test_notification_feed(self):
+        self.assertIndexedQueries('/messages/notifications/', ['messaging_notification'])
+
+    def test_chat_window(self):
+        self.assertIndexedQueries(f'/messages/chat/{self.convo.id}/', ['messaging_message'])
+
+    def test_query_budgets(self):
+        self.assertQueryBudget('/messages/')
+        self.assertQueryBudget('/messages/notifications/')
+        self.assertQueryBudget(f'/messages/chat/{self.convo.id}/', 11)
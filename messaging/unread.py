@@ -0,0 +1,41 @@
+"""
+Per-user unread notification counts, kept in the UnreadNotifications table.
+
+The counts live in the database rather than the cache because
+notifications are written by the task worker (see messaging.tasks), which
+shares no cache with the web processes. ``notes_added`` increments the
+counts in the transaction that inserts the notifications, and marking the
+feed read resets the count to zero. Every user gets a row when they sign
+up (see messaging.signals); one that is missing anyway is recounted from
+the Notification table on the next read.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import F
+
+from .models import Notification, UnreadNotifications
+
+
+def get_count(user_id):
+    count = UnreadNotifications.objects.filter(user_id=user_id).values_list('count', flat=True).first()
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        # A concurrent first read may have created the row already
+        UnreadNotifications.objects.bulk_create(
+            [UnreadNotifications(user_id=user_id, count=count)], ignore_conflicts=True
+        )
+    return count
+
+
+def notes_added(notes):
+    # One UPDATE per distinct increment, usually just one
+    users_by_added = defaultdict(list)
+    for user_id, added in Counter(note.user_id for note in notes).items():
+        users_by_added[added].append(user_id)
+    for added, user_ids in users_by_added.items():
+        # Users without a row are counted from scratch on their next read
+        UnreadNotifications.objects.filter(user_id__in=user_ids).update(count=F('count') + added)
+
+
+def reset(user_id):
+    UnreadNotifications.objects.filter(user_id=user_id).update(count=0)
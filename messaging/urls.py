@@ -4,8 +4,11 @@ from . import views
 urlpatterns = [
     path('', views.inbox, name='inbox'),
     path('chat/<int:conversation_id>/', views.chat_view, name='chat_view'),
+    path('chat/<int:conversation_id>/read/', views.mark_chat_read, name='mark_chat_read'),
+    path('chat/<int:conversation_id>/history/', views.chat_history, name='chat_history'),
     path('start/<int:user_id>/', views.start_chat, name='start_chat'),
     path('notifications/', views.notifications_view, name='notifications'),
+    path('stream/', views.event_stream, name='event_stream'),
     path('generate-reply/<int:conversation_id>/', views.generate_reply, name='generate_reply'),
 
 ]
@@ -1,59 +1,187 @@
+import asyncio
+import json
+from functools import partial
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib import messages
-from django.db.models import Count
-from django.db.models import Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Prefetch
 from accounts.models import User
 from jobs.models import Application
-from .models import Message, Notification, Conversation
+from skillbridge.pagination import CURSOR_PARAM, CursorPaginator, paginate, render_page, wants_json
+from .models import Message, Notification, Conversation, Participant
+from .serializers import serialize_message, serialize_notification
+from . import realtime, unread
+
+# Messages rendered with the chat page and returned per "load older" call
+CHAT_PAGE_SIZE = getattr(settings, 'CHAT_PAGE_SIZE', 50)
+# Comment line sent on idle streams so proxies don't close them
+STREAM_KEEPALIVE_SECONDS = 15
 
 @login_required
 def inbox(request):
-    conversations = Conversation.objects.filter(participants=request.user).order_by('-updated_at')
-    
-    # Enrich conversations with other user and last message
-    for convo in conversations:
-        convo.other_user = convo.participants.exclude(id=request.user.id).first()
-        last_msg = convo.messages.order_by('-timestamp').first()
-        convo.last_message = last_msg.content if last_msg else "No messages yet"
+    # Served from the denormalized last_message / unread_count columns:
+    # one query for the memberships (joined to conversation and last message)
+    # and one for the other participants, however many conversations there are.
+    memberships = (
+        Participant.objects.filter(user=request.user)
+        .select_related('conversation__last_message')
+        .prefetch_related(Prefetch(
+            'conversation__participants',
+            queryset=User.objects.exclude(id=request.user.id),
+            to_attr='other_participants',
+        ))
+        .order_by('-conversation__updated_at')
+    )
+
+    conversations = []
+    for membership in memberships:
+        convo = membership.conversation
+        convo.unread_count = membership.unread_count
+        convo.other_user = convo.other_participants[0] if convo.other_participants else None
+        conversations.append(convo)
 
     return render(request, 'messaging/inbox.html', {'conversations': conversations})
 
+def get_membership(conversation_id, user):
+    """
+    The user's Participant row for the conversation (None if they aren't in it),
+    annotated with whether they have ever sent a message there.
+    """
+    sent = Message.objects.filter(conversation_id=conversation_id, sender=user)
+    return (
+        Participant.objects.filter(conversation_id=conversation_id, user=user)
+        .annotate(has_sent=Exists(sent))
+        .first()
+    )
+
+
+def mark_read(membership):
+    """Reset the member's unread count and tell the other side their messages were read."""
+    if not membership.unread_count:
+        return
+    membership.unread_count = 0
+    membership.save(update_fields=['unread_count'])
+    Message.objects.filter(
+        conversation_id=membership.conversation_id, is_read=False
+    ).exclude(sender_id=membership.user_id).update(is_read=True)
+    participant_ids = list(
+        Participant.objects.filter(conversation_id=membership.conversation_id).values_list('user_id', flat=True)
+    )
+    transaction.on_commit(partial(
+        realtime.publish_read, membership.conversation_id, membership.user_id, participant_ids
+    ))
+
+
 @login_required
 def chat_view(request, conversation_id):
     conversation = get_object_or_404(Conversation, id=conversation_id)
 
     # Access check
-    if request.user not in conversation.participants.all():
+    membership = get_membership(conversation.id, request.user)
+    if membership is None:
          return redirect('inbox')
 
     # Handle POST (New Message)
     if request.method == 'POST':
         content = request.POST.get('content')
         if content:
-            Message.objects.create(
-                conversation=conversation,
-                sender=request.user,
-                content=content
-            )
-            # conversation.updated_at is auto-updated due to auto_now=True
-            conversation.save() 
+            # messaging.signals moves last_message/updated_at and bumps the
+            # other participants' unread counts in this same transaction
+            with transaction.atomic():
+                message = Message.objects.create(
+                    conversation=conversation,
+                    sender=request.user,
+                    content=content
+                )
+            # The chat page posts with fetch and appends the bubble itself,
+            # the other side gets it from the live stream
+            if wants_json(request):
+                return JsonResponse(serialize_message(message), status=201)
             return redirect('chat_view', conversation_id=conversation.id)
+        if wants_json(request):
+            return JsonResponse({'error': 'Empty message'}, status=400)
 
-    messages_qs = conversation.messages.order_by('timestamp')
+    # Opening the thread reads it
+    mark_read(membership)
+
+    # Only the newest CHAT_PAGE_SIZE messages; older ones come from chat_history
+    page = CursorPaginator(
+        conversation.messages.select_related('sender'), ('-timestamp', '-id'), per_page=CHAT_PAGE_SIZE
+    ).page()
     other_user = conversation.participants.exclude(id=request.user.id).first()
-    
-    # Check if current user has ever sent a message in this conversation
-    has_user_sent = messages_qs.filter(sender=request.user).exists()
 
     return render(request, 'messaging/chat.html', {
-        'messages': messages_qs,
+        'messages': page.object_list[::-1],
+        'older_cursor': page.next_cursor,
         'other_user': other_user,
         'conversation': conversation,
-        'has_user_sent': has_user_sent
+        'has_user_sent': membership.has_sent
+    })
+
+@require_POST
+@login_required
+def mark_chat_read(request, conversation_id):
+    # Called by an open chat page when a message arrives over the live stream
+    membership = get_membership(conversation_id, request.user)
+    if membership is None:
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    mark_read(membership)
+    return HttpResponse(status=204)
+
+@login_required
+def chat_history(request, conversation_id):
+    """
+    JSON page of messages older than ``cursor`` (the older_cursor of the chat
+    page, or the ``next`` of a previous call), oldest first.
+    """
+    if get_membership(conversation_id, request.user) is None:
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+    page = CursorPaginator(
+        Message.objects.filter(conversation_id=conversation_id).select_related('sender'),
+        ('-timestamp', '-id'),
+        per_page=CHAT_PAGE_SIZE,
+    ).page(request.GET.get(CURSOR_PARAM))
+
+    return JsonResponse({
+        'results': [serialize_message(message) for message in reversed(page.object_list)],
+        'next': page.next_cursor,
     })
 
+async def stream_events(user_id):
+    """Server-Sent Events lines for everything published to the user's channel."""
+    async with realtime.get_broker().subscribe(realtime.user_channel(user_id)) as queue:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@login_required
+async def event_stream(request):
+    """
+    Server-Sent Events stream of the user's realtime events (see
+    messaging.realtime). Needs the ASGI entry point; under WSGI a held-open
+    response would pin a worker, so clients are told to stop reconnecting
+    (204) and the pages keep working without live updates.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    response = StreamingHttpResponse(stream_events(user.id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def start_chat(request, user_id):
     # Helper to find/create conversation 
@@ -75,14 +203,19 @@ def start_chat(request, user_id):
 @login_required
 def notifications_view(request):
     # Allow all users to see notifications
-    notes = Notification.objects.filter(user=request.user).order_by('-created_at')
+    notes = Notification.objects.filter(user=request.user)
+    page = paginate(request, notes, ('-created_at', '-id'))
 
-    # Mark all as read
-    for note in notes.filter(is_read=False):
-        note.is_read = True
-        note.save()
+    # Mark all as read in one UPDATE; the page was fetched first,
+    # so it still shows which of its notifications were new
+    notes.filter(is_read=False).update(is_read=True)
+    unread.reset(request.user.id)
 
-    return render(request, 'messaging/notifications.html', {'notifications': notes})
+    # The badge count is known to be zero now, no need to read it back
+    return render_page(
+        request, 'messaging/notifications.html', {'notifications': page, 'unread_count': 0}, page,
+        serialize_notification,
+    )
 
 
 
@@ -2,6 +2,8 @@
 ASGI config for skillbridge project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The live chat/notification stream (messaging.views.event_stream) needs to be
+served through this entry point; under WSGI it is switched off.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
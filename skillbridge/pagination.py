@@ -0,0 +1,208 @@
+"""
+Keyset (cursor) pagination shared by the list views.
+
+Instead of OFFSET, each page is fetched with a WHERE clause on the ordering
+key of the last row seen, e.g. ``(posted_on, id) < (<last posted_on>, <last id>)``,
+so page 500 costs the same as page 1 as long as the ordering is indexed.
+Cursors are opaque url-safe tokens; a tampered or stale token simply
+falls back to the first page.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import render
+
+PAGE_SIZE = getattr(settings, 'CURSOR_PAGE_SIZE', 20)
+CURSOR_PARAM = 'cursor'
+
+
+class CursorEncoder(json.JSONEncoder):
+    # Unlike DjangoJSONEncoder this keeps microseconds, which the keyset
+    # comparison needs to land exactly on the last row seen.
+    def default(self, o):
+        if isinstance(o, (datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return super().default(o)
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps({'d': direction, 'v': values}, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, values = payload['d'], payload['v']
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, request=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.request = request
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _url(self, cursor):
+        if cursor is None or self.request is None:
+            return None
+        params = self.request.GET.copy()
+        params[CURSOR_PARAM] = cursor
+        params.pop('format', None)
+        return f"?{params.urlencode()}"
+
+    @property
+    def next_url(self):
+        return self._url(self.next_cursor)
+
+    @property
+    def previous_url(self):
+        return self._url(self.previous_cursor)
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, a tuple of field names such as
+    ``('-posted_on', '-id')``. The last field must be unique (normally the
+    primary key) so that every row has a distinct position.
+    """
+
+    def __init__(self, queryset, ordering, per_page=PAGE_SIZE):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _position(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _parse(self, values):
+        """Turn JSON cursor values back into Python values (e.g. datetimes)."""
+        if len(values) != len(self.fields):
+            raise ValidationError("cursor does not match ordering")
+        parsed = []
+        for field, value in zip(self.fields, values):
+            try:
+                model_field = self.queryset.model._meta.get_field(field)
+            except FieldDoesNotExist:
+                # Annotations such as search_rank are plain JSON numbers
+                if not isinstance(value, (int, float)):
+                    raise ValidationError("invalid cursor value")
+                parsed.append(value)
+            else:
+                parsed.append(model_field.to_python(value))
+        return parsed
+
+    def _seek(self, values, forward):
+        """
+        Build the keyset condition for rows strictly after (forward) or
+        before the given position in the current ordering.
+        """
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            descending = name.startswith('-')
+            after = descending if forward else not descending
+            lookup = 'lt' if after else 'gt'
+            clause = Q(**{f"{self.fields[i]}__{lookup}": values[i]})
+            for j in range(i):
+                clause &= Q(**{self.fields[j]: values[j]})
+            condition |= clause
+        return condition
+
+    def page(self, cursor=None, request=None):
+        decoded = decode_cursor(cursor) if cursor else None
+        values = None
+        if decoded:
+            try:
+                values = self._parse(decoded[1])
+            except ValidationError:
+                decoded = None
+
+        if decoded and decoded[0] == 'prev':
+            reverse = [name[1:] if name.startswith('-') else f"-{name}" for name in self.ordering]
+            rows = list(
+                self.queryset.filter(self._seek(values, forward=False))
+                .order_by(*reverse)[:self.per_page + 1]
+            )
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_previous, has_next = has_more, True
+        else:
+            qs = self.queryset.order_by(*self.ordering)
+            if decoded:
+                qs = qs.filter(self._seek(values, forward=True))
+            rows = list(qs[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = decoded is not None
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor('next', self._position(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor('prev', self._position(rows[0]))
+        return CursorPage(rows, next_cursor, previous_cursor, request=request)
+
+
+def paginate(request, queryset, ordering, per_page=PAGE_SIZE):
+    return CursorPaginator(queryset, ordering, per_page).page(
+        request.GET.get(CURSOR_PARAM), request=request
+    )
+
+
+def wants_json(request):
+    return (
+        request.GET.get('format') == 'json'
+        or request.headers.get('Accept', '').startswith('application/json')
+    )
+
+
+def render_page(request, template_name, context, page, serialize):
+    """
+    Render a paginated list, or its JSON variant for infinite scroll
+    (``?format=json`` or ``Accept: application/json``).
+    """
+    if wants_json(request):
+        return JsonResponse({
+            'results': [serialize(obj) for obj in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        })
+    context['page_obj'] = page
+    return render(request, template_name, context)
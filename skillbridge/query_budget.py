@@ -0,0 +1,113 @@
+"""
+Per-request SQL accounting.
+
+With ``QUERY_BUDGET_ENABLED = True``, QueryBudgetMiddleware records every
+query a request sends. It adds a ``Server-Timing`` header with the query
+count and database time (browsers show it in the network panel), and logs
+to the ``skillbridge.queries`` logger when:
+
+* the request ran more queries than its budget (``QUERY_BUDGETS`` by URL
+  name, otherwise ``QUERY_BUDGET_DEFAULT``), or
+* the same SELECT ran ``DUPLICATE_QUERY_THRESHOLD`` or more times, which
+  is almost always a lazy foreign key followed per row (N+1), e.g.::
+
+    inbox: 5 queries (1.92ms), budget 8; repeated 12x: SELECT ... WHERE "accounts_user"."id" = %s
+
+``QueryRecorder`` can also be used on its own; skillbridge.testing builds
+the tests' query budget assertion on it.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('skillbridge.queries')
+
+# "IN (%s, %s, %s)" -> "IN (...)", so batches of any size count as one shape
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def fingerprint(sql):
+    return IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Context manager that records the queries run on every database connection."""
+
+    def __init__(self):
+        self.queries = []  # (sql, seconds)
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(seconds for _, seconds in self.queries)
+
+    def duplicates(self, threshold=None):
+        """{fingerprint: times run} for SELECTs repeated ``threshold`` or more times."""
+        threshold = threshold or getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 3)
+        shapes = Counter(fingerprint(sql) for sql, _ in self.queries if sql.lstrip().upper().startswith('SELECT'))
+        return {sql: times for sql, times in shapes.most_common() if times >= threshold}
+
+
+def budget_for(url_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(url_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', 20))
+
+
+class QueryBudgetMiddleware:
+    """
+    Goes near the top of MIDDLEWARE so the session and auth lookups are
+    counted too. Switched off (removed from the chain) unless
+    ``QUERY_BUDGET_ENABLED`` is set.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        response['Server-Timing'] = (
+            f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"'
+        )
+
+        match = request.resolver_match
+        url_name = match.view_name if match else request.path
+        budget = budget_for(url_name)
+        duplicates = recorder.duplicates()
+        if recorder.count > budget or duplicates:
+            repeated = '; '.join(f'repeated {times}x: {sql}' for sql, times in duplicates.items())
+            logger.warning(
+                "%s: %d queries (%.2fms), budget %d%s",
+                url_name, recorder.count, recorder.duration * 1000, budget,
+                f'; {repeated}' if repeated else '',
+            )
+        return response
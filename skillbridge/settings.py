@@ -57,9 +57,11 @@ INSTALLED_APPS = [
     'jobs',
     'courses',
     'messaging.apps.MessagingConfig',
+    'tasks',
 ]
 
 MIDDLEWARE = [
+    'skillbridge.query_budget.QueryBudgetMiddleware',  # no-op unless QUERY_BUDGET_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', # Add Whitenoise Middleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,6 +70,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'messaging.middleware.NotificationBatchMiddleware',
 ]
 
 ROOT_URLCONF = 'skillbridge.urls'
@@ -135,6 +138,85 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory cache by default; point this at a shared backend
+# (e.g. Redis) in production so every worker sees the same entries.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'skillbridge',
+    }
+}
+
+# Seconds the homepage listings are served before one request rebuilds them
+HOME_CACHE_TTL = int(os.environ.get('HOME_CACHE_TTL', 60))
+
+
+# Fan-out backend for the live chat/notification stream (see messaging/realtime.py).
+# The in-memory broker only reaches clients connected to the same process.
+REALTIME_BROKER = os.environ.get('REALTIME_BROKER', 'messaging.realtime.InMemoryBroker')
+
+# Read notifications older than these are collapsed / deleted by compact_notifications
+NOTIFICATION_COLLAPSE_DAYS = int(os.environ.get('NOTIFICATION_COLLAPSE_DAYS', 7))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+
+# Log receiver count and time for every model save/delete (see skillbridge/signal_profiler.py)
+SIGNAL_PROFILING = os.environ.get('SIGNAL_PROFILING', 'False') == 'True'
+
+# Count queries per request, send Server-Timing and log over-budget / N+1 views
+# (see skillbridge/query_budget.py). Budgets are keyed by URL name.
+QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', str(DEBUG)) == 'True'
+QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT', 20))
+QUERY_BUDGETS = {
+    'inbox': 8,
+    'notifications': 8,
+    'job_list': 10,
+}
+DUPLICATE_QUERY_THRESHOLD = 3
+
+# Background tasks (see tasks/queue.py). Run `manage.py run_tasks` next to
+# the web process, or set TASKS_EAGER to run tasks inline when queued.
+TASKS_EAGER = os.environ.get('TASKS_EAGER', 'False') == 'True'
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10  # seconds, doubled for each further attempt
+
+# Seconds between runs of the periodic course expiry task
+COURSE_EXPIRY_INTERVAL = int(os.environ.get('COURSE_EXPIRY_INTERVAL', 15 * 60))
+
+# Longest the cached course catalog (courses/catalog.py) is kept, in
+# seconds; it is otherwise kept until the first listed course expires
+COURSE_CATALOG_MAX_TTL = int(os.environ.get('COURSE_CATALOG_MAX_TTL', 6 * 60 * 60))
+
+# Longest each process serves its in-memory copy of the listing plans
+# (courses/plans.py) after a plan is edited in another process, in seconds
+PLAN_REGISTRY_MAX_AGE = int(os.environ.get('PLAN_REGISTRY_MAX_AGE', 60))
+
+# How many courses the homepage features (see courses/featured.py); the
+# slate is rebuilt on the COURSE_EXPIRY_INTERVAL schedule
+FEATURED_COURSE_COUNT = int(os.environ.get('FEATURED_COURSE_COUNT', 6))
+
+# Job recommendations (see jobs/recommend.py): minimum seconds between index
+# rebuilds after jobs change, and how long a seeker's result is cached
+RECOMMENDATION_INDEX_MAX_AGE = int(os.environ.get('RECOMMENDATION_INDEX_MAX_AGE', 300))
+RECOMMENDATION_CACHE_TTL = int(os.environ.get('RECOMMENDATION_CACHE_TTL', 3600))
+# Seconds after which the index is rebuilt even if no job change was seen;
+# changes made in other processes only show up through a shared cache
+RECOMMENDATION_INDEX_REFRESH = int(os.environ.get('RECOMMENDATION_INDEX_REFRESH', 1800))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'skillbridge': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -152,3 +234,9 @@ AUTHENTICATION_BACKENDS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are streamed to disk, hashed and checked against per-field size
+# and type rules as they arrive (see skillbridge/uploads.py)
+FILE_UPLOAD_HANDLERS = ['skillbridge.uploads.StreamingUploadHandler']
+RESUME_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+AVATAR_MAX_UPLOAD_SIZE = 2 * 1024 * 1024
+
@@ -0,0 +1,76 @@
+"""
+Optional profiler for model signal dispatch.
+
+With ``SIGNAL_PROFILING = True`` every pre/post save and delete is timed and
+logged to the ``skillbridge.signals`` logger as the number of receivers that
+ran and the time they took, plus a running total for that model, e.g.::
+
+    post_save jobs.Job: 3 receivers in 1.84ms (412 sends, 610.02ms total)
+
+Only ``Signal.send`` is wrapped, so the receivers themselves are untouched.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.db.models import signals as model_signals
+
+logger = logging.getLogger('skillbridge.signals')
+
+PROFILED_SIGNALS = {
+    'pre_save': model_signals.pre_save,
+    'post_save': model_signals.post_save,
+    'pre_delete': model_signals.pre_delete,
+    'post_delete': model_signals.post_delete,
+}
+
+
+class SignalProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._originals = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # (signal name, model label) -> [sends, receivers run, seconds]
+            self.totals = defaultdict(lambda: [0, 0, 0.0])
+
+    def record(self, name, sender, receivers, elapsed):
+        label = getattr(getattr(sender, '_meta', None), 'label', repr(sender))
+        with self._lock:
+            totals = self.totals[(name, label)]
+            totals[0] += 1
+            totals[1] += receivers
+            totals[2] += elapsed
+            sends, total = totals[0], totals[2]
+        logger.info(
+            "%s %s: %d receivers in %.2fms (%d sends, %.2fms total)",
+            name, label, receivers, elapsed * 1000, sends, total * 1000,
+        )
+
+    def _wrap(self, name, signal):
+        send = signal.send
+
+        def profiled_send(sender, **named):
+            started = time.perf_counter()
+            responses = send(sender, **named)
+            self.record(name, sender, len(responses), time.perf_counter() - started)
+            return responses
+
+        return profiled_send
+
+    def install(self):
+        for name, signal in PROFILED_SIGNALS.items():
+            if name not in self._originals:
+                self._originals[name] = signal.send
+                signal.send = self._wrap(name, signal)
+
+    def uninstall(self):
+        for name, send in self._originals.items():
+            PROFILED_SIGNALS[name].send = send
+        self._originals.clear()
+
+
+profiler = SignalProfiler()
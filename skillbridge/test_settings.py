@@ -6,3 +6,6 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+
+# Run background tasks inline, as part of the code that queues them
+TASKS_EAGER = True
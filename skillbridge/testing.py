@@ -0,0 +1,86 @@
+"""
+Test helpers shared by the apps' test suites.
+"""
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .query_budget import QueryRecorder, budget_for
+
+# Full table scans in EXPLAIN output. SQLite reports "SCAN <table>" for a
+# scan of the table itself and "SCAN <table> USING [COVERING] INDEX ..."
+# for an ordered walk over an index, which is fine.
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+
+
+def explain(sql):
+    """The query plan for ``sql`` as text, in the database's own format."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Test tables are tiny, so the planner would rightly prefer a
+            # sequential scan; forbid it to see which index would be used
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def full_scans(plan):
+    return FULL_SCAN_PATTERNS[connection.vendor].findall(plan)
+
+
+class QueryPlanMixin:
+    """
+    ``assertIndexedQueries`` runs a request, EXPLAINs every SELECT it sent
+    against the given tables and fails if any of them scans one of those
+    tables in full. Must be used in a transactional test (TestCase).
+    """
+
+    def assertIndexedQueries(self, url, tables):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            self.skipTest(f'No query plan check for {connection.vendor}')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        checked = 0
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or not any(f'"{table}"' in sql for table in tables):
+                continue
+            plan = explain(sql)
+            scanned = [table for table in full_scans(plan) if table in tables]
+            self.assertFalse(scanned, f'Full scan of {scanned} for {url}:\n{sql}\n\n{plan}')
+            checked += 1
+
+        self.assertTrue(checked, f'{url} sent no queries against {tables}')
+        return response
+
+
+class QueryBudgetMixin:
+    """
+    ``assertQueryBudget`` requests a URL and fails if it ran more queries
+    than its budget (``QUERY_BUDGETS`` for the view's URL name unless given)
+    or repeated the same SELECT, the signature of a per-row lazy lookup.
+    """
+
+    def assertQueryBudget(self, url, budget=None, **extra):
+        with QueryRecorder() as recorder:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+
+        if budget is None:
+            budget = budget_for(response.resolver_match.view_name)
+        queries = '\n'.join(sql for sql, _ in recorder.queries)
+        self.assertLessEqual(
+            recorder.count, budget, f'{url} ran {recorder.count} queries, budget {budget}:\n{queries}'
+        )
+        duplicates = recorder.duplicates()
+        self.assertFalse(duplicates, f'{url} repeats queries (N+1?): {duplicates}')
+        return response
@@ -0,0 +1,182 @@
+"""
+Upload handling for resumes and avatars.
+
+``StreamingUploadHandler`` (the only entry in FILE_UPLOAD_HANDLERS) writes
+each uploaded file to a temporary file chunk by chunk, hashing it on the
+way. It also enforces ``UPLOAD_RULES`` as the data arrives:
+
+* the extension (and the file's first bytes) must be one the field allows;
+* once a file passes its field's size limit, the rest of it is discarded;
+* a request whose Content-Length is over the largest limit gets all of its
+  files discarded up front.
+
+A rejected file never reaches ``request.FILES``. Its reason is kept for
+the view instead, see ``upload_error``.
+
+``ContentAddressedStorage`` names every file after the SHA-256 of its
+contents, e.g. ``resumes/3f/3fa2...c9.pdf``. Saving content that is
+already stored returns the existing name, so the same resume uploaded for
+ten applications is stored once. Rows share files, so files must never be
+deleted through one of them. Derived files (avatar thumbnails) are stored
+beside the original with ``save_beside``.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+MB = 1024 * 1024
+
+# Per form field: the size limit and, per allowed extension, the bytes a
+# genuine file of that type starts with
+UPLOAD_RULES = {
+    'resume': {
+        'max_size': getattr(settings, 'RESUME_MAX_UPLOAD_SIZE', 5 * MB),
+        'types': {
+            '.pdf': (b'%PDF',),
+            '.doc': (b'\xd0\xcf\x11\xe0',),
+            '.docx': (b'PK\x03\x04',),
+        },
+    },
+    'avatar': {
+        'max_size': getattr(settings, 'AVATAR_MAX_UPLOAD_SIZE', 2 * MB),
+        'types': {
+            '.jpg': (b'\xff\xd8\xff',),
+            '.jpeg': (b'\xff\xd8\xff',),
+            '.png': (b'\x89PNG',),
+            '.gif': (b'GIF87a', b'GIF89a'),
+            '.webp': (b'RIFF',),
+        },
+    },
+}
+# Fields without rules (e.g. admin uploads) only get a size limit
+DEFAULT_MAX_SIZE = getattr(settings, 'UPLOAD_MAX_SIZE', 10 * MB)
+
+
+def max_size(field_name):
+    return UPLOAD_RULES.get(field_name, {}).get('max_size', DEFAULT_MAX_SIZE)
+
+
+def describe_size(size):
+    return f'{size / MB:g} MB'
+
+
+def upload_error(request, field_name):
+    """Why the file sent as ``field_name`` was rejected, or None."""
+    request.FILES  # parses the body if nothing has yet, recording rejections
+    return getattr(request, 'upload_errors', {}).get(field_name)
+
+
+class StreamingUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.request_too_large = False
+
+    def reject(self, message):
+        if self.request is not None:
+            if not hasattr(self.request, 'upload_errors'):
+                self.request.upload_errors = {}
+            self.request.upload_errors[self.field_name] = message
+        # The parser then closes (and so deletes) the partial temporary file
+        raise SkipFile
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        limit = max([DEFAULT_MAX_SIZE] + [rules['max_size'] for rules in UPLOAD_RULES.values()])
+        # A little room for the other form fields and multipart framing
+        self.request_too_large = content_length > limit + MB
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        # The previous file is in request.FILES now; forget it so a rejection
+        # of this one can't close it
+        self.__dict__.pop('file', None)
+        self.field_name = field_name
+        self.limit = max_size(field_name)
+        if self.request_too_large:
+            self.reject(f'Files must be smaller than {describe_size(self.limit)}.')
+
+        self.signatures = None
+        rules = UPLOAD_RULES.get(field_name)
+        if rules:
+            extension = os.path.splitext(file_name)[1].lower()
+            if extension not in rules['types']:
+                self.reject(f'Please upload a {", ".join(sorted(rules["types"]))} file.')
+            self.signatures = rules['types'][extension]
+
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and self.signatures and not raw_data.startswith(self.signatures):
+            self.reject("That file's contents don't match its type.")
+        if start + len(raw_data) > self.limit:
+            self.reject(f'Files must be smaller than {describe_size(self.limit)}.')
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
+
+
+def file_digest(content):
+    """SHA-256 of a file, from the upload handler if it already computed it."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, prefix, **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = prefix
+
+    def content_name(self, name, content):
+        # Only the extension of the incoming name survives; the field's
+        # upload_to directory gives way to the storage's prefix
+        digest = file_digest(content)
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(self.prefix, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_beside(self, name, suffix, content):
+        """
+        Store a file derived from ``name`` (e.g. a thumbnail) next to it,
+        as ``<name without extension>_<suffix>``. The original's hash
+        already identifies the content, so an existing file is kept.
+        """
+        target = beside(name, suffix)
+        if self.exists(target):
+            return target
+        return super().save(target, content)
+
+
+def beside(name, suffix):
+    return f'{posixpath.splitext(name)[0]}_{suffix}'
+
+
+def resume_storage():
+    return ContentAddressedStorage('resumes')
+
+
+def avatar_storage():
+    return ContentAddressedStorage('avatars')
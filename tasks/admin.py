@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Schedule, Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('last_error',)
+    actions = ['requeue']
+
+    @admin.action(description="Requeue selected tasks")
+    def requeue(self, request, queryset):
+        updated = queryset.update(status=Task.QUEUED, attempts=0, run_at=timezone.now(), locked_at=None)
+        self.message_user(request, f"Requeued {updated} tasks.")
+
+
+@admin.register(Schedule)
+class ScheduleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'next_run_at', 'last_run_at')
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks import queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs queued background tasks, polling for new ones until interrupted, '
+        'and queues periodic tasks when they are due.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no task is due instead of polling.')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Tasks claimed per round trip.')
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Seconds to wait between polls while the queue is empty.')
+
+    def handle(self, *args, **options):
+        succeeded = failed = 0
+        try:
+            while True:
+                # Long-running process: drop connections the database closed or that aged out
+                close_old_connections()
+                queue.run_schedules()
+                claimed = queue.claim(options['batch_size'])
+                for t in claimed:
+                    if queue.run(t):
+                        succeeded += 1
+                    else:
+                        failed += 1
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} tasks, {failed} failed.'))
@@ -0,0 +1,185 @@
+"""
+A small database-backed queue for side effects that don't have to finish
+inside the request::
+
+    from tasks.queue import task
+
+    @task(max_attempts=3)
+    def notify_new_message(message_id):
+        ...
+
+    notify_new_message.enqueue(message.id)
+
+``enqueue`` inserts a Task row in the caller's transaction, so a worker
+only sees the task once the work that queued it has committed, and never
+if it rolled back. ``manage.py run_tasks`` claims due tasks, runs each in
+its own transaction, and retries failures with exponential backoff
+(``TASK_RETRY_DELAY`` doubled per attempt) until ``max_attempts``, after
+which the task is kept as failed. Successful tasks are deleted.
+
+Arguments are stored as JSON, so pass ids rather than model instances.
+With ``TASKS_EAGER = True`` (the test settings) ``enqueue`` runs the task
+on the spot instead, after round-tripping the arguments through JSON so
+unserializable ones still fail.
+
+Tasks are registered by importing the module that defines them; every
+app's ``tasks.py`` is imported at startup (see TasksConfig.ready).
+
+``@task(every=timedelta(...))`` also makes a task periodic: the worker
+queues it whenever it is due. Due times live in the Schedule table and a
+worker claims a run by moving ``next_run_at`` forward with a conditional
+UPDATE, so however many workers poll, each run is queued exactly once.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Schedule, Task
+
+logger = logging.getLogger('skillbridge.tasks')
+
+DEFAULT_MAX_ATTEMPTS = getattr(settings, 'TASK_MAX_ATTEMPTS', 5)
+RETRY_DELAY = getattr(settings, 'TASK_RETRY_DELAY', 10)
+MAX_RETRY_DELAY = getattr(settings, 'TASK_MAX_RETRY_DELAY', 60 * 60)
+# A task still "running" this many seconds after it was claimed belongs
+# to a worker that died, and is claimed again
+LOCK_TIMEOUT = getattr(settings, 'TASK_LOCK_TIMEOUT', 10 * 60)
+
+_registry = {}
+_schedules = {}   # task name -> interval (timedelta)
+_next_runs = {}   # task name -> when this process expects it next due
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts):
+        update_wrapper(self, func)
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        return enqueue(self.name, args, kwargs)
+
+
+def task(func=None, *, name=None, max_attempts=DEFAULT_MAX_ATTEMPTS, every=None):
+    """
+    Register ``func`` as a task; usable as ``@task`` or ``@task(...)``.
+    With ``every`` (a timedelta) the worker also queues it periodically.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        _registry[task_name] = TaskFunction(func, task_name, max_attempts)
+        if every is not None:
+            _schedules[task_name] = every
+        return _registry[task_name]
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f'No task registered as {name!r}') from None
+
+
+def enqueue(name, args=(), kwargs=None, run_at=None):
+    """Queue task ``name``; returns the Task row, or None when run eagerly."""
+    task_function = get_task(name)
+    args, kwargs = list(args), kwargs or {}
+
+    if getattr(settings, 'TASKS_EAGER', False):
+        args, kwargs = json.loads(json.dumps([args, kwargs]))
+        task_function(*args, **kwargs)
+        return None
+
+    return Task.objects.create(
+        name=name,
+        args=args,
+        kwargs=kwargs,
+        max_attempts=task_function.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def claim(batch_size=10):
+    """Mark up to ``batch_size`` due tasks as running and return them, oldest first."""
+    now = timezone.now()
+    due = (
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=LOCK_TIMEOUT))
+    )
+    with transaction.atomic():
+        # SKIP LOCKED lets several workers claim side by side on PostgreSQL
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('run_at', 'id')[:batch_size]
+        )
+        Task.objects.filter(id__in=[t.id for t in tasks]).update(
+            status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1,
+        )
+    for t in tasks:
+        t.status, t.locked_at, t.attempts = Task.RUNNING, now, t.attempts + 1
+    return tasks
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def run(t):
+    """Run a claimed task; returns True if it succeeded."""
+    try:
+        with transaction.atomic():
+            get_task(t.name)(*t.args, **t.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        pending = Task.objects.filter(pk=t.pk)
+        if t.attempts >= t.max_attempts:
+            pending.update(status=Task.FAILED, locked_at=None, last_error=error)
+            logger.error('Task %s #%s failed after %d attempts', t.name, t.pk, t.attempts, exc_info=True)
+        else:
+            pending.update(
+                status=Task.QUEUED, locked_at=None, last_error=error,
+                run_at=timezone.now() + retry_delay(t.attempts),
+            )
+            logger.warning('Task %s #%s failed (attempt %d of %d), retrying',
+                           t.name, t.pk, t.attempts, t.max_attempts, exc_info=True)
+        return False
+
+    Task.objects.filter(pk=t.pk).delete()
+    return True
+
+
+def run_schedules(now=None):
+    """Queue every periodic task that is due; returns the names queued."""
+    now = now or timezone.now()
+    queued = []
+    for name, every in _schedules.items():
+        # This process's last look at the schedule; saves a query per poll
+        # until then
+        if name in _next_runs and now < _next_runs[name]:
+            continue
+        Schedule.objects.get_or_create(name=name, defaults={'next_run_at': now})
+        claimed = Schedule.objects.filter(name=name, next_run_at__lte=now).update(
+            next_run_at=now + every, last_run_at=now,
+        )
+        if claimed:
+            _next_runs[name] = now + every
+            enqueue(name)
+            queued.append(name)
+        else:
+            # Not due yet, or another worker just claimed this run
+            _next_runs[name] = Schedule.objects.values_list('next_run_at', flat=True).get(name=name)
+    return queued
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Schedule, Task
+
+calls = []
+
+
+@queue.task(max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@queue.task(max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        # Keep the apps' periodic tasks out of these workers' way
+        for registry in (queue._schedules, queue._next_runs):
+            patcher = mock.patch.dict(registry, clear=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_worker_runs_and_deletes_queued_tasks(self):
+        record.enqueue('a')
+        record.enqueue('b')
+        self.assertEqual(calls, [])
+
+        out = StringIO()
+        call_command('run_tasks', '--once', stdout=out)
+
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertFalse(Task.objects.exists())
+        self.assertIn('Ran 2 tasks, 0 failed', out.getvalue())
+
+    def test_rolled_back_work_queues_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                record.enqueue('lost')
+                raise RuntimeError
+        self.assertFalse(Task.objects.exists())
+
+    def test_failures_back_off_then_fail(self):
+        explode.enqueue()
+
+        with self.assertLogs('skillbridge.tasks', level='WARNING'):
+            self.assertFalse(queue.run(queue.claim()[0]))
+        t = Task.objects.get()
+        self.assertEqual((t.status, t.attempts), (Task.QUEUED, 1))
+        self.assertIn('boom', t.last_error)
+        self.assertGreater(t.run_at, timezone.now() + queue.retry_delay(1) - timedelta(seconds=5))
+        self.assertEqual(queue.claim(), [])  # not due yet
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('skillbridge.tasks', level='ERROR'):
+            queue.run(queue.claim()[0])
+        t.refresh_from_db()
+        self.assertEqual((t.status, t.attempts), (Task.FAILED, 2))
+        self.assertEqual(queue.claim(), [])
+
+    def test_tasks_of_a_dead_worker_are_claimed_again(self):
+        record.enqueue('again')
+        queue.claim()
+        self.assertEqual(queue.claim(), [])
+
+        Task.objects.update(locked_at=timezone.now() - timedelta(seconds=queue.LOCK_TIMEOUT + 1))
+        self.assertEqual([t.attempts for t in queue.claim()], [2])
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_inline_with_json_arguments(self):
+        self.assertIsNone(record.enqueue(('x', 1)))
+        self.assertEqual(calls, [['x', 1]])
+        with self.assertRaises(TypeError):
+            record.enqueue(object())
+        self.assertFalse(Task.objects.exists())
+
+    def test_periodic_tasks_are_queued_once_per_interval(self):
+        queue._schedules[record.name] = timedelta(minutes=5)
+        now = timezone.now()
+
+        self.assertEqual(queue.run_schedules(now), [record.name])
+        # A second worker, knowing nothing of the first, finds it claimed
+        queue._next_runs.clear()
+        self.assertEqual(queue.run_schedules(now + timedelta(seconds=1)), [])
+        self.assertEqual(Task.objects.filter(name=record.name).count(), 1)
+
+        with self.assertNumQueries(0):
+            queue.run_schedules(now + timedelta(minutes=4))
+        self.assertEqual(queue.run_schedules(now + timedelta(minutes=5)), [record.name])
+        self.assertEqual(Schedule.objects.get().next_run_at, now + timedelta(minutes=10))